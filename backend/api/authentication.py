@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """
+    Кеш token -> (user, token).
+    Первый уровень – ограниченный LRU в памяти процесса с коротким TTL,
+    второй – общий кеш Django.
+    """
+
+    prefix = "auth-token:"
+
+    def __init__(self, maxsize, local_ttl, shared_ttl):
+        self.maxsize = maxsize
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cache_key(self, key):
+        return self.prefix + sha256(key.encode()).hexdigest()
+
+    def _set_local(self, key, value):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.local_ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            expires_value = self._local.get(key)
+            if expires_value is not None:
+                expires, value = expires_value
+                if expires > time.monotonic():
+                    self._local.move_to_end(key)
+                    return value
+                del self._local[key]
+        value = cache.get(self.cache_key(key))
+        if value is not None:
+            self._set_local(key, value)
+        return value
+
+    def set(self, key, value):
+        cache.set(self.cache_key(key), value, self.shared_ttl)
+        self._set_local(key, value)
+
+    def delete(self, key):
+        cache.delete(self.cache_key(key))
+        with self._lock:
+            self._local.pop(key, None)
+
+
+token_cache = TokenCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    local_ttl=settings.TOKEN_CACHE_LOCAL_TTL,
+    shared_ttl=settings.TOKEN_CACHE_TTL,
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication без запроса Token join User на каждый запрос.
+    Кеш сбрасывается сигналами при удалении токена и изменении
+    пользователя; другие процессы видят сброс не позже
+    TOKEN_CACHE_LOCAL_TTL секунд.
+    """
+
+    def authenticate_credentials(self, key):
+        user_token = token_cache.get(key)
+        if user_token is None:
+            user_token = super().authenticate_credentials(key)
+            token_cache.set(key, user_token)
+        return user_token
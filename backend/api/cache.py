@@ -0,0 +1,71 @@
+import time
+from functools import wraps
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def version_key(namespace: str) -> str:
+    return f"version:{namespace}"
+
+
+def initial_version() -> int:
+    """
+    Начальная версия – время в микросекундах. Ключ версии может
+    вытеснить кеш (FileBasedCache удаляет записи при MAX_ENTRIES
+    независимо от срока жизни); версия, заведённая заново, больше
+    всех прежних, и записи под старыми версиями не оживают.
+    """
+    return time.time_ns() // 1000
+
+
+def get_version(namespace: str) -> int:
+    """Текущая версия набора данных namespace для ключей кеша."""
+    version = cache.get(version_key(namespace))
+    if version is None:
+        version = initial_version()
+        cache.add(version_key(namespace), version, None)
+        version = cache.get(version_key(namespace), version)
+    return version
+
+
+def bump_version(namespace: str) -> int:
+    """Инвалидация всех ключей кеша, построенных на версии namespace."""
+    try:
+        return cache.incr(version_key(namespace))
+    except ValueError:
+        version = initial_version()
+        cache.set(version_key(namespace), version, None)
+        return version
+
+
+def cache_anonymous_response(namespace: str):
+    """
+    Кеширование ответа метода вьюсета для анонимных пользователей.
+    Ключ – полный url запроса и версия namespace.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not request.user.is_anonymous:
+                return method(self, request, *args, **kwargs)
+            key = "response:{}:{}:{}".format(
+                namespace,
+                get_version(namespace),
+                sha1(request.build_absolute_uri().encode()).hexdigest(),
+            )
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, settings.RESPONSE_CACHE_TTL)
+            return response
+
+        return wrapper
+
+    return decorator
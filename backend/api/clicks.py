@@ -0,0 +1,78 @@
+"""
+Счётчики переходов по коротким ссылкам. Переход – запрос на чтение,
+поэтому клики копятся в памяти процесса и записываются одним UPDATE
+на пачку ссылок раз в SHORT_LINK_FLUSH_INTERVAL секунд
+(или при SHORT_LINK_BUFFER_SIZE ссылок в буфере и при выходе процесса).
+"""
+import atexit
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import (Case, DateTimeField, F, PositiveBigIntegerField,
+                              Value, When)
+from django.utils import timezone
+
+from food.models import ShortLink
+
+from . import constants
+
+_lock = threading.Lock()
+_clicks = Counter()
+_last_clicked = {}
+_flushed_at = time.monotonic()
+
+
+def record(link_id):
+    """Учёт перехода по ссылке link_id."""
+    with _lock:
+        _clicks[link_id] += 1
+        _last_clicked[link_id] = timezone.now()
+        due = (
+            len(_clicks) >= constants.SHORT_LINK_BUFFER_SIZE
+            or time.monotonic() - _flushed_at
+            >= settings.SHORT_LINK_FLUSH_INTERVAL
+        )
+    if due:
+        flush()
+
+
+def flush():
+    """Запись накопленных кликов в БД одним UPDATE."""
+    global _flushed_at
+    with _lock:
+        clicks, last_clicked = dict(_clicks), dict(_last_clicked)
+        _clicks.clear()
+        _last_clicked.clear()
+        _flushed_at = time.monotonic()
+    if not clicks:
+        return
+    try:
+        ShortLink.objects.filter(id__in=clicks).update(
+            clicks=F("clicks")
+            + Case(
+                *(
+                    When(id=pk, then=Value(count))
+                    for pk, count in clicks.items()
+                ),
+                output_field=PositiveBigIntegerField(),
+            ),
+            last_clicked_at=Case(
+                *(
+                    When(id=pk, then=Value(clicked_at))
+                    for pk, clicked_at in last_clicked.items()
+                ),
+                output_field=DateTimeField(),
+            ),
+        )
+    except DatabaseError:
+        # Клики не теряем: вернём их в буфер до следующей записи
+        with _lock:
+            _clicks.update(clicks)
+            for pk, clicked_at in last_clicked.items():
+                _last_clicked.setdefault(pk, clicked_at)
+
+
+atexit.register(flush)
@@ -0,0 +1,244 @@
+"""
+Быстрый путь чтения для списков: ответ собирается из строк .values()
+и словарей связанных объектов, без моделей и полей DRF на каждый объект.
+Результат совпадает с обычными сериализаторами: проверка –
+api/tests/test_compiled.py, замер – manage.py check_compiled_serializers.
+"""
+from collections import defaultdict
+from operator import attrgetter, itemgetter
+
+from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from rest_framework import serializers
+
+from food.models import IngredientRecipe, Recipe
+from users.models import User
+
+from .fieldsets import RECIPE_COLUMNS
+
+INGREDIENT_FIELDS = ("id", "name", "measurement_unit")
+RECIPE_MINI_FIELDS = ("id", "name", "cooking_time", "image")
+TAG_FIELDS = ("id", "name", "slug")
+INGREDIENT_RECIPE_FIELDS = ("id", "name", "measurement_unit", "amount")
+RECIPE_FIELDS = (
+    "id",
+    "tags",
+    "author",
+    "ingredients",
+    "is_favorited",
+    "is_in_shopping_cart",
+    "name",
+    "image",
+    "text",
+    "cooking_time",
+)
+AUTHOR_COLUMNS = ("username", "first_name", "last_name", "email", "avatar")
+SUBSCRIPTION_FIELDS = (
+    "id",
+    "username",
+    "first_name",
+    "last_name",
+    "email",
+    "is_subscribed",
+    "recipes",
+    "recipes_count",
+    "avatar",
+)
+
+
+def image_url(model, field_name, request=None):
+    """
+    Функция имя файла -> url, как ImageField DRF:
+    storage поля и build_absolute_uri выбираются один раз.
+    """
+    storage = model._meta.get_field(field_name).storage
+    build_absolute_uri = request.build_absolute_uri if request else None
+
+    def to_url(name):
+        name = getattr(name, "name", name)
+        if not name:
+            return None
+        url = storage.url(name)
+        return build_absolute_uri(url) if build_absolute_uri else url
+
+    return to_url
+
+
+def get_rows(data, fields):
+    """Строки-словари из QuerySet через .values() или из списка объектов."""
+    if isinstance(data, models.Manager):
+        data = data.all()
+    if isinstance(data, models.QuerySet) and data._result_cache is None:
+        return data.values(*fields)
+    getter = attrgetter(*fields)
+    return [dict(zip(fields, getter(obj))) for obj in data]
+
+
+def ingredients(data, request=None):
+    return list(get_rows(data, INGREDIENT_FIELDS))
+
+
+def recipes_mini(data, request=None):
+    image = image_url(Recipe, "image", request)
+    return [
+        dict(row, image=image(row["image"]))
+        for row in get_rows(data, RECIPE_MINI_FIELDS)
+    ]
+
+
+def recipe_fragments(recipe_ids, request=None, fields=None):
+    """
+    Фрагменты RecipeListSerializer по id рецептов, не больше трёх
+    запросов: теги и ингредиенты читаются, только если входят в fields.
+    Флаги пользователя – False, их подставляет with_user_flags.
+    """
+    fields = fields or RECIPE_FIELDS
+    tags = defaultdict(list)
+    if "tags" in fields:
+        for recipe_id, *tag in (
+            Recipe.tags.through.objects.filter(recipe_id__in=recipe_ids)
+            .order_by("tag_id")
+            .values_list("recipe_id", "tag_id", "tag__name", "tag__slug")
+        ):
+            tags[recipe_id].append(dict(zip(TAG_FIELDS, tag)))
+    recipe_ingredients = defaultdict(list)
+    if "ingredients" in fields:
+        for recipe_id, *ingredient in (
+            IngredientRecipe.objects.filter(recipe_id__in=recipe_ids)
+            .order_by("id")
+            .values_list(
+                "recipe_id",
+                "ingredient_id",
+                "ingredient__name",
+                "ingredient__measurement_unit",
+                "amount",
+            )
+        ):
+            recipe_ingredients[recipe_id].append(
+                dict(zip(INGREDIENT_RECIPE_FIELDS, ingredient))
+            )
+    image = image_url(Recipe, "image", request)
+    avatar = image_url(User, "avatar", request)
+    builders = {
+        "id": itemgetter("id"),
+        "tags": lambda row: tags[row["id"]],
+        "author": lambda row: {
+            "email": row["author__email"],
+            "id": row["author_id"],
+            "username": row["author__username"],
+            "first_name": row["author__first_name"],
+            "last_name": row["author__last_name"],
+            "is_subscribed": False,
+            "avatar": avatar(row["author__avatar"]),
+        },
+        "ingredients": lambda row: recipe_ingredients[row["id"]],
+        "is_favorited": lambda row: False,
+        "is_in_shopping_cart": lambda row: False,
+        "name": itemgetter("name"),
+        "image": lambda row: image(row["image"]),
+        "text": itemgetter("text"),
+        "cooking_time": itemgetter("cooking_time"),
+    }
+    columns = ["id"]
+    for name in fields:
+        columns.extend(RECIPE_COLUMNS.get(name, ()))
+    return {
+        row["id"]: {name: builders[name](row) for name in fields}
+        for row in Recipe.objects.filter(id__in=recipe_ids)
+        .order_by()
+        .values(*columns)
+    }
+
+
+def subscriptions(data, request, fields=None):
+    """
+    Подписки текущего пользователя за три запроса: авторы, число их
+    рецептов и не больше recipes_limit последних рецептов каждого
+    автора (без recipes и recipes_count – только авторы).
+    Картинки рецептов – относительные url, как у RecipeMiniSerializer
+    без контекста в get_recipes.
+    """
+    fields = fields or SUBSCRIPTION_FIELDS
+    subscribes = list(data.all() if isinstance(data, models.Manager) else data)
+    author_ids = [subscribe.author_id for subscribe in subscribes]
+    authors = {
+        row["id"]: row
+        for row in User.objects.filter(id__in=author_ids).values(
+            "id", *(name for name in AUTHOR_COLUMNS if name in fields)
+        )
+    }
+    limit = request.GET.get("recipes_limit")
+    limit = int(limit) if limit and limit.isdigit() else None
+    counts = {}
+    if "recipes" in fields or "recipes_count" in fields:
+        counts = dict(
+            Recipe.objects.filter(author_id__in=author_ids)
+            .order_by()
+            .values("author_id")
+            .annotate(count=Count("id"))
+            .values_list("author_id", "count")
+        )
+    recipes = defaultdict(list)
+    if "recipes" in fields and limit != 0:
+        rows = Recipe.objects.filter(author_id__in=author_ids)
+        if limit is not None:
+            # Последние limit рецептов каждого автора отбираются в SQL
+            rows = rows.filter(
+                id__in=Subquery(
+                    Recipe.objects.filter(
+                        author_id=OuterRef("author_id")
+                    ).values("id")[:limit]
+                )
+            )
+        for row in rows.values("author_id", *RECIPE_MINI_FIELDS):
+            recipes[row.pop("author_id")].append(row)
+    is_subscribed = not request.user.is_anonymous
+    image = image_url(Recipe, "image")
+    avatar = image_url(User, "avatar", request)
+    builders = {
+        "id": itemgetter("id"),
+        "username": itemgetter("username"),
+        "first_name": itemgetter("first_name"),
+        "last_name": itemgetter("last_name"),
+        "email": itemgetter("email"),
+        "is_subscribed": lambda author: is_subscribed,
+        "recipes": lambda author: [
+            dict(row, image=image(row["image"]))
+            for row in recipes[author["id"]]
+        ],
+        "recipes_count": lambda author: counts.get(author["id"], 0),
+        "avatar": lambda author: avatar(author["avatar"]),
+    }
+    return [
+        {
+            name: builders[name](authors[subscribe.author_id])
+            for name in fields
+        }
+        for subscribe in subscribes
+    ]
+
+
+class CompiledListSerializer(serializers.ListSerializer):
+    """ListSerializer, который строит список функцией build."""
+
+    build = None
+
+    def to_representation(self, data):
+        return self.build(data, self.context.get("request"))
+
+
+class IngredientListSerializer(CompiledListSerializer):
+    build = staticmethod(ingredients)
+
+
+class RecipeMiniListSerializer(CompiledListSerializer):
+    build = staticmethod(recipes_mini)
+
+
+class SubscribeListSerializer(CompiledListSerializer):
+    build = staticmethod(subscriptions)
+
+    def to_representation(self, data):
+        return self.build(
+            data, self.context.get("request"), tuple(self.child.fields)
+        )
@@ -18,3 +18,48 @@ API_POS = 1
 GET_LINK_POS = 4
 
 SHORT_LINK_SL_PREFIX_SHIFT = 3
+SHORT_LINK_BUFFER_SIZE = 1000
+SHORT_LINK_SWEEP_BATCH_SIZE = 1000
+
+MAX_BULK_RECIPES = 100
+MAX_PANTRY_INGREDIENTS = 100
+
+BULK_STATUS_CREATED = "created"
+BULK_STATUS_EXISTS = "exists"
+BULK_STATUS_DELETED = "deleted"
+BULK_STATUS_MISSING = "missing"
+BULK_STATUS_NOT_FOUND = "not_found"
+
+CACHE_TAGS = "tags"
+CACHE_INGREDIENTS = "ingredients"
+CACHE_RECIPES = "recipes"
+CACHE_PANTRY = "pantry"
+PANTRY_MAX_CHANGES = 1000
+
+FEED_FANOUT_MAX_FOLLOWERS = 1000
+FEED_BACKFILL_SIZE = 100
+FEED_PAGE_SIZE = 6
+FEED_MAX_PAGE_SIZE = 100
+
+RANKING_POPULAR = "popular"
+RANKING_TRENDING = "trending"
+RANKINGS = (RANKING_POPULAR, RANKING_TRENDING)
+RANKING_WINDOW_DAYS = 14
+RANKING_HALF_LIFE_DAYS = 3
+RANKING_BATCH_SIZE = 1000
+
+SIMILAR_RECIPES_COUNT = 10
+SIMILARITY_BATCH_SIZE = 256
+SIMILARITY_COSINE = "cosine"
+SIMILARITY_JACCARD = "jaccard"
+
+RECIPE_EXPORT_BATCH_SIZE = 1000
+
+MEDIA_GC_BATCH_SIZE = 500
+
+BULK_DELETE_BATCH_SIZE = 500
+
+TASK_BATCH_SIZE = 10
+
+INGREDIENT_SEARCH_LIMIT = 20
+INGREDIENT_SEARCH_THRESHOLD = 0.5
@@ -0,0 +1,187 @@
+"""
+Быстрое удаление пользователей и рецептов с большим числом связей.
+Зависимые строки удаляются прямыми DELETE по id родителей в заданном
+порядке, без загрузки объектов в память и без сигналов; кеши и счётчики
+сбрасываются один раз на пачку. Связь, не указанная в плане, нарушит
+внешний ключ, и транзакция пачки откатится целиком.
+"""
+from collections import Counter
+
+from django.contrib.admin.models import LogEntry
+from django.core.cache import cache
+from django.db import router, transaction
+from rest_framework.authtoken.models import Token
+
+from food.models import (Favorite, FeedEntry, IngredientRecipe, Recipe,
+                         RecipeRanking, ShoppingCart, SimilarRecipe, Subscribe)
+from users.models import User
+
+from . import constants, feed, interactions, media, pantry
+from .authentication import token_cache
+from .cache import bump_version
+from .tasks import task
+
+# Порядок удаления зависимых строк: (модель, поле со ссылкой на родителя)
+RECIPE_DEPENDANTS = (
+    (FeedEntry, "recipe"),
+    (SimilarRecipe, "recipe"),
+    (SimilarRecipe, "similar"),
+    (RecipeRanking, "recipe"),
+    (Favorite, "recipe"),
+    (ShoppingCart, "recipe"),
+    (IngredientRecipe, "recipe"),
+    (Recipe.tags.through, "recipe"),
+)
+USER_DEPENDANTS = (
+    (FeedEntry, "user"),
+    (FeedEntry, "author"),
+    (Favorite, "author"),
+    (ShoppingCart, "author"),
+    (Subscribe, "user"),
+    (Subscribe, "author"),
+    (Token, "user"),
+    (LogEntry, "user"),
+    (User.groups.through, "user"),
+    (User.user_permissions.through, "user"),
+)
+
+
+def raw_delete(model, **lookups):
+    """DELETE ... WHERE без сборщика связей Django и сигналов."""
+    queryset = model.objects.filter(**lookups)
+    return queryset._raw_delete(router.db_for_write(model))
+
+
+def chunks(queryset, batch_size):
+    """id из queryset пачками по возрастанию, без OFFSET."""
+    last_id = 0
+    while True:
+        ids = list(
+            queryset.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def interaction_users(recipe_ids):
+    """Пользователи, у которых рецепты в избранном или в покупках."""
+    users = set()
+    for model in (Favorite, ShoppingCart):
+        users.update(
+            model.objects.filter(recipe_id__in=recipe_ids)
+            .values_list("author_id", flat=True)
+            .distinct()
+        )
+    return users
+
+
+def release_media(model, field, ids):
+    names = Counter(
+        name
+        for name in model.objects.filter(id__in=ids).values_list(
+            field, flat=True
+        )
+        if name
+    )
+    for name, count in names.items():
+        media.change_refs(name, -count)
+
+
+def delete_recipe_batch(recipe_ids):
+    """Удаление пачки рецептов, возвращает затронутых пользователей."""
+    users = interaction_users(recipe_ids)
+    release_media(Recipe, "image", recipe_ids)
+    for model, field in RECIPE_DEPENDANTS:
+        raw_delete(model, **{f"{field}_id__in": recipe_ids})
+    raw_delete(Recipe, id__in=recipe_ids)
+    return users
+
+
+def invalidate(users=(), tokens=(), recipes=(), authors=()):
+    """Сброс кешей после удаления пачки."""
+    bump_version(constants.CACHE_RECIPES)
+    if recipes:
+        pantry.publish(recipes)
+    cache.delete_many([interactions.cache_key(user) for user in users])
+    for key in tokens:
+        token_cache.delete(key)
+    # Популярные авторы, потерявшие подписчиков
+    for author_id in authors:
+        feed.sync_popularity.delay(author_id)
+
+
+def delete_recipes(
+    queryset, batch_size=constants.BULK_DELETE_BATCH_SIZE, progress=None
+):
+    """
+    Удаление рецептов queryset пачками по batch_size,
+    каждая пачка – отдельная транзакция. Возвращает число рецептов.
+    """
+    total = 0
+    for recipe_ids in chunks(queryset, batch_size):
+        with transaction.atomic():
+            users = delete_recipe_batch(recipe_ids)
+        invalidate(users, recipes=recipe_ids)
+        total += len(recipe_ids)
+        if progress:
+            progress(total)
+    return total
+
+
+def delete_users(
+    queryset, batch_size=constants.BULK_DELETE_BATCH_SIZE, progress=None
+):
+    """
+    Удаление пользователей queryset вместе с их рецептами, избранным,
+    списками покупок и подписками. Рецепты удаляются пачками по
+    batch_size до удаления автора. Возвращает число пользователей.
+    """
+    total = 0
+    for user_ids in chunks(queryset, batch_size):
+        users = set()
+        for recipe_ids in chunks(
+            Recipe.objects.filter(author_id__in=user_ids), batch_size
+        ):
+            with transaction.atomic():
+                users |= delete_recipe_batch(recipe_ids)
+            pantry.publish(recipe_ids)
+        with transaction.atomic():
+            # Подписчики удаляемых авторов теряют подписки
+            users.update(
+                Subscribe.objects.filter(author_id__in=user_ids).values_list(
+                    "user_id", flat=True
+                )
+            )
+            authors = set(
+                Subscribe.objects.filter(
+                    user_id__in=user_ids, author__is_popular=True
+                ).values_list("author_id", flat=True)
+            ).difference(user_ids)
+            tokens = list(
+                Token.objects.filter(user_id__in=user_ids).values_list(
+                    "key", flat=True
+                )
+            )
+            release_media(User, "avatar", user_ids)
+            for model, field in USER_DEPENDANTS:
+                raw_delete(model, **{f"{field}_id__in": user_ids})
+            raw_delete(User, id__in=user_ids)
+        invalidate(users.union(user_ids), tokens, authors=authors)
+        total += len(user_ids)
+        if progress:
+            progress(total)
+    return total
+
+
+@task()
+def delete_recipes_by_id(recipe_ids):
+    delete_recipes(Recipe.objects.filter(id__in=recipe_ids))
+
+
+@task()
+def delete_users_by_id(user_ids):
+    delete_users(User.objects.filter(id__in=user_ids))
@@ -0,0 +1,145 @@
+"""
+Лента подписок. Рецепты авторов с числом подписчиков не больше
+FEED_FANOUT_MAX_FOLLOWERS раскладываются по лентам при публикации
+(FeedEntry), рецепты популярных авторов (User.is_popular) читаются
+при чтении ленты. Признак популярности меняет только задача
+sync_popularity под блокировкой строки автора, и раскладка при записи
+и выборка при чтении опираются на одно его значение.
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from food.models import FeedEntry, Recipe, Subscribe
+from users.models import User
+
+from . import constants
+from .interactions import get_interactions
+from .tasks import task
+
+
+def get_followers(author_id):
+    """
+    id подписчиков автора или None, если подписчиков больше
+    FEED_FANOUT_MAX_FOLLOWERS.
+    """
+    followers = list(
+        Subscribe.objects.filter(author_id=author_id).values_list(
+            "user_id", flat=True
+        )[: constants.FEED_FANOUT_MAX_FOLLOWERS + 1]
+    )
+    if len(followers) > constants.FEED_FANOUT_MAX_FOLLOWERS:
+        return None
+    return followers
+
+
+def lock_author(author_id):
+    """Строка автора под блокировкой до конца транзакции."""
+    return (
+        User.objects.select_for_update()
+        .only("id", "is_popular")
+        .filter(id=author_id)
+        .first()
+    )
+
+
+def fill(user_ids, author_id):
+    """Последние рецепты автора в ленты пользователей user_ids."""
+    recipe_ids = list(
+        Recipe.objects.filter(author_id=author_id)
+        .order_by("-id")
+        .values_list("id", flat=True)[: constants.FEED_BACKFILL_SIZE]
+    )
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(
+                user_id=user_id, recipe_id=recipe_id, author_id=author_id
+            )
+            for user_id in user_ids
+            for recipe_id in recipe_ids
+        ],
+        batch_size=constants.FEED_BACKFILL_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+@task()
+def fan_out(recipe_id, author_id):
+    """Добавление нового рецепта в ленты подписчиков автора."""
+    with transaction.atomic():
+        author = lock_author(author_id)
+        if author is None or author.is_popular:
+            return
+        FeedEntry.objects.bulk_create(
+            [
+                FeedEntry(
+                    user_id=user_id,
+                    recipe_id=recipe_id,
+                    author_id=author_id,
+                )
+                for user_id in Subscribe.objects.filter(
+                    author_id=author_id
+                ).values_list("user_id", flat=True)
+            ],
+            ignore_conflicts=True,
+        )
+
+
+@task()
+def sync_popularity(author_id):
+    """
+    Смена признака популярности по текущему числу подписчиков.
+    Ставший популярным автор читается при чтении ленты, его записи
+    в FeedEntry больше не нужны. Перестав быть популярным, автор
+    сначала раскладывает последние рецепты по лентам подписчиков.
+    """
+    with transaction.atomic():
+        author = lock_author(author_id)
+        if author is None:
+            return
+        followers = get_followers(author_id)
+        if (followers is None) == author.is_popular:
+            return
+        if followers is None:
+            FeedEntry.objects.filter(author_id=author_id).delete()
+        else:
+            fill(followers, author_id)
+        author.is_popular = followers is None
+        author.save(update_fields=("is_popular",))
+
+
+def followers_changed(author):
+    """Пересчёт признака популярности, если порог пересечён."""
+    if (get_followers(author.id) is None) != author.is_popular:
+        sync_popularity.delay(author.id)
+
+
+def backfill(user, author):
+    """Последние рецепты автора в ленту нового подписчика."""
+    with transaction.atomic():
+        if not lock_author(author.id).is_popular:
+            fill((user.id,), author.id)
+    followers_changed(author)
+
+
+def trim(user, author):
+    """Удаление рецептов автора из ленты при отписке."""
+    FeedEntry.objects.filter(user=user, author=author).delete()
+    followers_changed(author)
+
+
+def get_feed(request):
+    """
+    Рецепты из ленты пользователя и рецепты популярных авторов,
+    на которых он подписан.
+    """
+    return Recipe.objects.filter(
+        Q(
+            id__in=FeedEntry.objects.filter(user=request.user).values(
+                "recipe_id"
+            )
+        )
+        | Q(
+            author_id__in=get_interactions(request).following,
+            author__is_popular=True,
+        )
+    )
@@ -0,0 +1,94 @@
+"""
+Разреженные наборы полей ответа: ?fields=id,name,image или ?omit=text.
+Набор полей сокращает не только ответ, но и выборку: столбцы для
+.only()/.values() и связи для prefetch берутся только для нужных полей.
+"""
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+# Поле RecipeListSerializer -> столбцы Recipe для .only() и .values()
+RECIPE_COLUMNS = {
+    "author": (
+        "author_id",
+        "author__email",
+        "author__username",
+        "author__first_name",
+        "author__last_name",
+        "author__avatar",
+    ),
+    "name": ("name",),
+    "image": ("image",),
+    "text": ("text",),
+    "cooking_time": ("cooking_time",),
+}
+# Поле RecipeListSerializer -> связи для prefetch_related
+RECIPE_PREFETCH = {
+    "tags": ("tags",),
+    "ingredients": ("recipe_ingredients__ingredient",),
+}
+# Ключи кеша фрагментов рецептов нужны всегда
+RECIPE_KEY_COLUMNS = ("id", "updated_at")
+
+
+def split(value):
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
+def requested_fields(request, available):
+    """
+    Поля из available в их порядке с учётом ?fields= и ?omit=.
+    id выводится всегда, неизвестное поле – ошибка 400.
+    """
+    available = tuple(available)
+    if request is None:
+        return available
+    fields = split(request.GET.get("fields"))
+    omit = split(request.GET.get("omit"))
+    unknown = (fields | omit) - set(available)
+    if unknown:
+        raise ValidationError(
+            {"fields": "Неизвестные поля: " + ", ".join(sorted(unknown))}
+        )
+    return tuple(
+        name
+        for name in available
+        if name == "id"
+        or ((not fields or name in fields) and name not in omit)
+    )
+
+
+def recipe_queryset(queryset, fields, detail=False):
+    """
+    Выборка рецептов под набор полей. Для списков нужны только ключи
+    кеша фрагментов: промахи собираются compiled.recipe_fragments.
+    """
+    if not detail:
+        return queryset.only(*RECIPE_KEY_COLUMNS)
+    columns = list(RECIPE_KEY_COLUMNS)
+    for name in fields:
+        columns.extend(RECIPE_COLUMNS.get(name, ()))
+    queryset = queryset.only(*columns)
+    if "author" in fields:
+        queryset = queryset.select_related("author")
+    return queryset.prefetch_related(
+        *(
+            relation
+            for name in fields
+            for relation in RECIPE_PREFETCH.get(name, ())
+        )
+    )
+
+
+class SparseFieldsMixin:
+    """Сериализатор верхнего уровня выводит поля по ?fields= и ?omit=."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.parent is not None and not isinstance(
+            self.parent, serializers.ListSerializer
+        ):
+            return fields
+        return {
+            name: fields[name]
+            for name in requested_fields(self.context.get("request"), fields)
+        }
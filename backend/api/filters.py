@@ -1,12 +1,35 @@
+from django.db.models import Case, F, IntegerField, When
 from django_filters.rest_framework import FilterSet, filters
 from rest_framework.filters import SearchFilter
 
 from food.models import Recipe, Tag
 
+from . import constants
+from .ingredient_search import get_index
+
 
 class IngredientSearchFilter(SearchFilter):
+    """
+    ?name= – ингредиенты, название которых начинается с запроса,
+    затем похожие названия (опечатки) по убыванию схожести.
+    """
+
     search_param = "name"
 
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "")
+        if not query.strip():
+            return queryset
+        ids = get_index().search(query)
+        if not ids:
+            return queryset.none()
+        return queryset.filter(id__in=ids).order_by(
+            Case(
+                *(When(id=pk, then=rank) for rank, pk in enumerate(ids)),
+                output_field=IntegerField(),
+            )
+        )
+
 
 class RecipeFilter(FilterSet):
     """Фильтр выборки рецептов по определенным полям."""
@@ -20,10 +43,20 @@ class RecipeFilter(FilterSet):
         method="filter_is_in_shopping_cart"
     )
     is_favorited = filters.BooleanFilter(method="filter_is_favorited")
+    ordering = filters.ChoiceFilter(
+        choices=[(ranking, ranking) for ranking in constants.RANKINGS],
+        method="filter_ordering",
+    )
 
     class Meta:
         model = Recipe
-        fields = ("tags", "author", "is_favorited", "is_in_shopping_cart")
+        fields = (
+            "tags",
+            "author",
+            "is_favorited",
+            "is_in_shopping_cart",
+            "ordering",
+        )
 
     def filter_is_favorited(self, queryset, name, value):
         if self.request.user.is_authenticated and value:
@@ -34,3 +67,9 @@ class RecipeFilter(FilterSet):
         if self.request.user.is_authenticated and value:
             return queryset.filter(shopping_cart__author=self.request.user)
         return queryset
+
+    def filter_ordering(self, queryset, name, value):
+        """Рецепты из таблицы рейтингов с местом в выбранном рейтинге."""
+        return queryset.filter(ranking__isnull=False).annotate(
+            rank=F(f"ranking__{value}_rank")
+        )
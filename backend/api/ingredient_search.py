@@ -0,0 +1,118 @@
+"""
+Поиск ингредиентов с опечатками: триграммный индекс названий в памяти
+процесса (как pg_trgm: слова дополняются пробелами, схожесть – доля
+триграмм запроса, найденных в названии). Совпадения по началу
+названия идут первыми.
+"""
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from heapq import nsmallest
+
+from food.models import Ingredient
+
+from . import constants
+from .cache import get_version
+
+
+def normalize(text):
+    return " ".join(text.lower().replace("ё", "е").split())
+
+
+def trigrams(text):
+    """Множество триграмм слов строки, как show_trgm в Postgres."""
+    result = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        result.update(map("".join, zip(padded, padded[1:], padded[2:])))
+    return result
+
+
+class TrigramIndex:
+    """Триграмма -> отсортированный массив id ингредиентов."""
+
+    def __init__(self, version, rows=None):
+        self.version = version
+        if rows is None:
+            rows = Ingredient.objects.order_by("id").values_list("id", "name")
+        self.postings = defaultdict(lambda: array("q"))
+        self.sizes = {}
+        names = []
+        for ingredient_id, name in rows:
+            grams = trigrams(name)
+            for gram in grams:
+                self.postings[gram].append(ingredient_id)
+            self.sizes[ingredient_id] = len(grams)
+            names.append((normalize(name), ingredient_id))
+        names.sort()
+        self.names = [name for name, _ in names]
+        self.ids = [ingredient_id for _, ingredient_id in names]
+
+    def prefix_matches(self, query):
+        """id ингредиентов, название которых начинается с query."""
+        start = bisect_left(self.names, query)
+        end = bisect_left(self.names, query + "\uffff", start)
+        return self.ids[start:end]
+
+    def search(
+        self,
+        query,
+        limit=constants.INGREDIENT_SEARCH_LIMIT,
+        threshold=constants.INGREDIENT_SEARCH_THRESHOLD,
+    ):
+        """
+        id ингредиентов по убыванию схожести с query: сначала все
+        совпадения по началу названия, затем до limit похожих названий
+        с долей общих триграмм не ниже threshold.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        grams = trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        def similarity(ingredient_id):
+            """
+            Доля триграмм запроса в названии (как word_similarity),
+            при равенстве – ближе по длине (как similarity).
+            """
+            common = shared[ingredient_id]
+            return (
+                common / len(grams),
+                common / (len(grams) + self.sizes[ingredient_id] - common),
+            )
+
+        prefix = self.prefix_matches(query)
+        ranked = sorted(prefix, key=lambda pk: (-similarity(pk)[1], pk))
+        seen = set(prefix)
+        fuzzy = nsmallest(
+            limit,
+            (
+                (-word_score, -score, ingredient_id)
+                for ingredient_id, (word_score, score) in (
+                    (ingredient_id, similarity(ingredient_id))
+                    for ingredient_id in shared
+                    if ingredient_id not in seen
+                )
+                if word_score >= threshold
+            ),
+        )
+        ranked.extend(ingredient_id for *_, ingredient_id in fuzzy)
+        return ranked
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def get_index():
+    """Индекс, перестраиваемый при изменении справочника ингредиентов."""
+    global _index
+    version = get_version(constants.CACHE_INGREDIENTS)
+    with _lock:
+        if _index is None or _index.version != version:
+            _index = TrigramIndex(version)
+        return _index
@@ -0,0 +1,73 @@
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from food.models import Favorite, ShoppingCart, Subscribe
+
+# Модель -> (поле пользователя, поле объекта, имя множества)
+SOURCES = {
+    Favorite: ("author_id", "recipe_id", "favorites"),
+    ShoppingCart: ("author_id", "recipe_id", "shopping_cart"),
+    Subscribe: ("user_id", "author_id", "following"),
+}
+
+
+class UserInteractions:
+    """
+    Избранное, список покупок и подписки пользователя:
+    id рецептов и авторов в виде множеств для проверки флагов
+    is_favorited, is_in_shopping_cart и is_subscribed без запросов к БД.
+    """
+
+    def __init__(self, favorites=(), shopping_cart=(), following=()):
+        self.favorites = frozenset(favorites)
+        self.shopping_cart = frozenset(shopping_cart)
+        self.following = frozenset(following)
+
+
+def cache_key(user_id):
+    return f"interactions:{user_id}"
+
+
+def load(user_id):
+    """
+    Отсортированные массивы id из кеша,
+    при промахе – из БД (по запросу на таблицу).
+    """
+    state = cache.get(cache_key(user_id))
+    if state is None:
+        state = {
+            name: array(
+                "q",
+                sorted(
+                    model.objects.filter(**{user_field: user_id}).values_list(
+                        object_field, flat=True
+                    )
+                ),
+            )
+            for model, (user_field, object_field, name) in SOURCES.items()
+        }
+        cache.set(cache_key(user_id), state, settings.INTERACTIONS_CACHE_TTL)
+    return state
+
+
+def get_interactions(request):
+    """Состояние текущего пользователя, загружается один раз на запрос."""
+    interactions = getattr(request, "_interactions", None)
+    if interactions is None:
+        if request is None or request.user.is_anonymous:
+            return UserInteractions()
+        interactions = UserInteractions(**load(request.user.id))
+        request._interactions = interactions
+    return interactions
+
+
+def invalidate(user_id):
+    """
+    Сброс состояния после записи: следующее чтение загрузит его из БД.
+    Обновление массивов в кеше на месте теряло бы одну из параллельных
+    записей пользователя.
+    """
+    transaction.on_commit(lambda: cache.delete(cache_key(user_id)))
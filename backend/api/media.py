@@ -0,0 +1,83 @@
+"""
+Счётчики ссылок моделей на файлы хранилища (MediaFile).
+Имя файла при загрузке модели запоминается в экземпляре,
+при сохранении и удалении счётчики меняются на разницу.
+"""
+from django.db.models import Count, F
+
+from food.models import MediaFile, Recipe
+from users.models import User
+
+MEDIA_FIELDS = {Recipe: ("image",), User: ("avatar",)}
+
+
+def field_name(instance, field):
+    """Имя файла без обращения к дескриптору (и к БД для отложенных)."""
+    value = instance.__dict__.get(field)
+    return getattr(value, "name", value) or ""
+
+
+def remember(instance):
+    instance._media_names = {
+        field: field_name(instance, field)
+        for field in MEDIA_FIELDS[type(instance)]
+        if field in instance.__dict__
+    }
+
+
+def change_refs(name, delta):
+    if not name:
+        return
+    if not MediaFile.objects.filter(name=name).update(refs=F("refs") + delta):
+        MediaFile.objects.get_or_create(name=name, defaults={"refs": delta})
+
+
+def saved(instance, created):
+    old_names = {} if created else getattr(instance, "_media_names", {})
+    for field in MEDIA_FIELDS[type(instance)]:
+        if field not in instance.__dict__:
+            continue
+        name = field_name(instance, field)
+        # Без известного старого имени (отложенное поле) счётчик не трогаем
+        if not created and field not in old_names:
+            continue
+        if name != old_names.get(field, ""):
+            change_refs(name, 1)
+            change_refs(old_names.get(field, ""), -1)
+    remember(instance)
+
+
+def deleted(instance):
+    for field in MEDIA_FIELDS[type(instance)]:
+        change_refs(getattr(instance, "_media_names", {}).get(field), -1)
+
+
+def references(names):
+    """Сколько раз каждое из имён используется в моделях."""
+    counts = dict.fromkeys(names, 0)
+    for model, fields in MEDIA_FIELDS.items():
+        for field in fields:
+            for name, count in (
+                model.objects.filter(**{f"{field}__in": names})
+                .values_list(field)
+                .annotate(count=Count("pk"))
+                .order_by()
+            ):
+                counts[name] += count
+    return counts
+
+
+def recount():
+    """Пересчёт всех счётчиков по фактическим ссылкам моделей."""
+    MediaFile.objects.update(refs=0)
+    for model, fields in MEDIA_FIELDS.items():
+        for field in fields:
+            for name, count in (
+                model.objects.exclude(**{field: ""})
+                .exclude(**{f"{field}__isnull": True})
+                .values_list(field)
+                .annotate(count=Count("pk"))
+                .order_by()
+                .iterator()
+            ):
+                change_refs(name, count)
@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+from . import constants
+
+
+class FeedPagination(CursorPagination):
+    """Постраничный вывод ленты по ключу (id рецепта)."""
+
+    ordering = "-id"
+    page_size = constants.FEED_PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = constants.FEED_MAX_PAGE_SIZE
+
+
+class RankingPagination(CursorPagination):
+    """
+    Постраничный вывод рецептов по месту в рейтинге.
+    Место аннотируется фильтром RecipeFilter.filter_ordering.
+    """
+
+    ordering = "rank"
+    page_size_query_param = "limit"
+    max_page_size = constants.FEED_MAX_PAGE_SIZE
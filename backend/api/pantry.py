@@ -0,0 +1,145 @@
+"""
+Поиск рецептов по имеющимся ингредиентам: инвертированный индекс
+ингредиент -> отсортированный массив id рецептов. Число совпадений
+считается обходом списков рецептов запрошенных ингредиентов.
+Изменения рецептов попадают в индексы других процессов через журнал
+в кеше: версия CACHE_PANTRY -> id изменённых рецептов.
+"""
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from food.models import IngredientRecipe
+
+from . import constants
+from .cache import bump_version, get_version
+
+
+def change_key(version):
+    return f"pantry:changes:{version}"
+
+
+def recipe_ingredients(recipe_ids=None):
+    """Пары (id рецепта, id ингредиента), по возрастанию id рецепта."""
+    queryset = IngredientRecipe.objects.order_by("recipe_id")
+    if recipe_ids is not None:
+        queryset = queryset.filter(recipe_id__in=recipe_ids)
+    return queryset.values_list("recipe_id", "ingredient_id").iterator()
+
+
+class PantryIndex:
+    """Индекс состава рецептов в памяти процесса."""
+
+    def __init__(self, version):
+        self.version = version
+        self.postings = defaultdict(lambda: array("q"))
+        self.recipes = defaultdict(set)
+        for recipe_id, ingredient_id in recipe_ingredients():
+            if ingredient_id not in self.recipes[recipe_id]:
+                self.postings[ingredient_id].append(recipe_id)
+                self.recipes[recipe_id].add(ingredient_id)
+
+    def remove(self, recipe_id):
+        for ingredient_id in self.recipes.pop(recipe_id, ()):
+            postings = self.postings[ingredient_id]
+            position = bisect_left(postings, recipe_id)
+            if position < len(postings) and postings[position] == recipe_id:
+                del postings[position]
+
+    def update(self, recipe_ids):
+        """Перечитать состав рецептов; удалённые рецепты выпадают."""
+        for recipe_id in recipe_ids:
+            self.remove(recipe_id)
+        for recipe_id, ingredient_id in recipe_ingredients(recipe_ids):
+            if ingredient_id not in self.recipes[recipe_id]:
+                insort(self.postings[ingredient_id], recipe_id)
+                self.recipes[recipe_id].add(ingredient_id)
+
+    def search(self, ingredient_ids, max_missing=None, recipe_ids=None):
+        """
+        Рецепты, в которых есть хотя бы один из ингредиентов,
+        отсортированные по числу недостающих ингредиентов:
+        список пар (id рецепта, не хватает ингредиентов).
+        recipe_ids – множество допустимых рецептов (None – все).
+        """
+        matched = Counter()
+        for ingredient_id in set(ingredient_ids):
+            matched.update(self.postings.get(ingredient_id, ()))
+        result = []
+        for recipe_id, count in matched.items():
+            if recipe_ids is not None and recipe_id not in recipe_ids:
+                continue
+            missing = len(self.recipes[recipe_id]) - count
+            if max_missing is None or missing <= max_missing:
+                result.append((missing, recipe_id))
+        result.sort(key=lambda item: (item[0], -item[1]))
+        return [(recipe_id, missing) for missing, recipe_id in result]
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def get_index():
+    """
+    Индекс с изменениями других процессов из журнала; если журнал
+    неполон или слишком длинен – индекс перестраивается целиком.
+    """
+    global _index
+    version = get_version(constants.CACHE_PANTRY)
+    with _lock:
+        if _index is not None and _index.version != version:
+            missed = range(_index.version + 1, version + 1)
+            changes = (
+                cache.get_many(map(change_key, missed))
+                if 0 < len(missed) <= constants.PANTRY_MAX_CHANGES
+                else {}
+            )
+            if missed and len(changes) == len(missed):
+                _index.update(set().union(*changes.values()))
+                _index.version = version
+            else:
+                _index = None
+        if _index is None:
+            _index = PantryIndex(version)
+        return _index
+
+
+def publish(recipe_ids):
+    """Запись изменённых рецептов в журнал под новой версией."""
+    version = bump_version(constants.CACHE_PANTRY)
+    cache.set(
+        change_key(version), sorted(recipe_ids), settings.PANTRY_CHANGES_TTL
+    )
+
+
+_pending = threading.local()
+
+
+def refresh_recipe(recipe_id):
+    """
+    Учёт изменения состава рецепта: одна запись журнала на транзакцию
+    после коммита, сколько бы строк в ней ни изменилось.
+    """
+    if not connection.in_atomic_block:
+        publish([recipe_id])
+        return
+    callback = getattr(_pending, "callback", None)
+    if callback is None or all(
+        func is not callback for _, func in connection.run_on_commit
+    ):
+        recipe_ids = set()
+
+        def callback():
+            _pending.callback = None
+            publish(recipe_ids)
+
+        callback.recipe_ids = recipe_ids
+        _pending.callback = callback
+        transaction.on_commit(callback)
+    callback.recipe_ids.add(recipe_id)
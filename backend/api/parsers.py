@@ -0,0 +1,39 @@
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Целые длиннее 64 бит orjson читает как float, json – как int
+LONG_INTEGER = re.compile(rb"\d{20}")
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser на orjson: тело запроса разбирается прямо из байтов,
+    без декодирования в строку (важно для картинок в base64).
+    Ошибки и прочие кодировки обрабатывает стандартный JSONParser,
+    чтобы сообщения об ошибках не отличались.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_INTEGER.search(body):
+            return super().parse(
+                io.BytesIO(body), media_type, parser_context
+            )
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(
+                io.BytesIO(body), media_type, parser_context
+            )
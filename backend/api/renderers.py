@@ -0,0 +1,78 @@
+import decimal
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def same_float(value):
+    """
+    Запишет ли orjson float так же, как json: экспоненту он пишет
+    иначе (1e16 вместо 1e+16), а nan и inf – как null.
+    """
+    return orjson.dumps(value) == float.__repr__(value).encode()
+
+
+def has_mismatched_float(data):
+    """Есть ли в данных float, который orjson запишет не так, как json."""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, float) and not same_float(value):
+            return True
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson с тем же побайтно результатом, что у DRF:
+    даты, Decimal и ленивые строки переводов кодируются
+    через encoder_class DRF. Если orjson не установлен, нужен отступ
+    или в данных есть float, который json запишет иначе, используется
+    стандартный JSONRenderer. Целые длиннее 64 бит orjson не пишет
+    (TypeError) – такие ответы тоже отдаёт стандартный рендерер.
+    """
+
+    def default(self, obj):
+        if isinstance(obj, decimal.Decimal):
+            value = float(obj)
+            if not same_float(value):
+                raise TypeError("Decimal is rendered by json")
+            return value
+        return self.encoder_class().default(obj)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+            or has_mismatched_float(data)
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except (TypeError, ValueError):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Как и JSONRenderer, экранируем разделители строк для JavaScript
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -1,5 +1,8 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.core.validators import MaxLengthValidator
-from django.db import transaction
+from django.db import models, transaction
+from django.utils import timezone
 from rest_framework import serializers, status
 from rest_framework.exceptions import ValidationError
 from rest_framework.validators import UniqueValidator
@@ -8,7 +11,9 @@ from food.models import (Favorite, Ingredient, IngredientRecipe, Recipe,
                          ShoppingCart, ShortLink, Subscribe, Tag)
 from users.serializers import Base64ImageField, UserListRetrieveSerializer
 
-from . import constants
+from . import compiled, constants, feed
+from .fieldsets import SparseFieldsMixin
+from .interactions import get_interactions
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -69,6 +74,44 @@ class ShoppingCartSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "image", "cooking_time")
 
 
+class RecipeBulkSerializer(serializers.Serializer):
+    """Сериалайзер списка id рецептов для массовых операций."""
+
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=constants.MAX_BULK_RECIPES,
+    )
+
+    def validate_recipes(self, value):
+        return list(dict.fromkeys(value))
+
+
+class PantrySerializer(serializers.Serializer):
+    """Параметры поиска рецептов по имеющимся ингредиентам."""
+
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=constants.MAX_PANTRY_INGREDIENTS,
+    )
+    max_missing = serializers.IntegerField(min_value=0, required=False)
+
+    def validate_ingredients(self, value):
+        value = set(value)
+        unknown = value - set(
+            Ingredient.objects.filter(id__in=value).values_list(
+                "id", flat=True
+            )
+        )
+        if unknown:
+            raise serializers.ValidationError(
+                "Нет ингредиентов с id: "
+                + ", ".join(map(str, sorted(unknown)))
+            )
+        return sorted(value)
+
+
 class IngredientSerializer(serializers.ModelSerializer):
     """Сериалайзер модели Ingredient."""
 
@@ -76,6 +119,7 @@ class IngredientSerializer(serializers.ModelSerializer):
         model = Ingredient
         fields = ("id", "name", "measurement_unit")
         read_only_fields = ("__all__",)
+        list_serializer_class = compiled.IngredientListSerializer
 
 
 class AddIngredientSerializer(serializers.ModelSerializer):
@@ -105,8 +149,49 @@ class IngredientRecipeSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "measurement_unit", "amount")
 
 
-class RecipeListSerializer(serializers.ModelSerializer):
-    """Serializer для чтения модели Recipe."""
+class RecipeFragmentListSerializer(serializers.ListSerializer):
+    """
+    Список рецептов из кеша фрагментов: одна выборка get_many на страницу,
+    фрагменты промахов собираются из .values() (api.compiled).
+    """
+
+    def to_representation(self, data):
+        recipes = list(
+            data.all() if isinstance(data, models.Manager) else data
+        )
+        keys = {
+            recipe.id: self.child.fragment_key(recipe) for recipe in recipes
+        }
+        fragments = cache.get_many(keys.values())
+        missing = [
+            recipe for recipe in recipes if keys[recipe.id] not in fragments
+        ]
+        if missing:
+            built = {
+                keys[recipe_id]: fragment
+                for recipe_id, fragment in compiled.recipe_fragments(
+                    [recipe.id for recipe in missing],
+                    self.context.get("request"),
+                    tuple(self.child.fields),
+                ).items()
+            }
+            cache.set_many(built, settings.RECIPE_FRAGMENT_TTL)
+            fragments.update(built)
+        # Рецепт, удалённый после выборки страницы, пропускаем
+        return [
+            self.child.with_user_flags(fragments[keys[recipe.id]])
+            for recipe in recipes
+            if keys[recipe.id] in fragments
+        ]
+
+
+class RecipeListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer для чтения модели Recipe.
+    Не зависящая от пользователя часть ответа кешируется по id рецепта,
+    updated_at и набору полей (?fields=, ?omit=), флаги пользователя
+    добавляются при каждом запросе.
+    """
 
     author = UserListRetrieveSerializer()
     tags = TagSerializer(many=True, read_only=True)
@@ -130,20 +215,54 @@ class RecipeListSerializer(serializers.ModelSerializer):
             "text",
             "cooking_time",
         )
+        list_serializer_class = RecipeFragmentListSerializer
+
+    def fragment_key(self, instance):
+        request = self.context.get("request")
+        fields = tuple(self.fields)
+        return "recipe-fragment:{}:{}:{}:{}".format(
+            instance.id,
+            instance.updated_at.timestamp(),
+            request.get_host() if request else "",
+            "" if fields == self.Meta.fields else ",".join(fields),
+        )
+
+    def to_fragment(self, instance):
+        return super().to_representation(instance)
+
+    def with_user_flags(self, fragment):
+        interactions = get_interactions(self.context.get("request"))
+        data = dict(fragment)
+        if "is_favorited" in data:
+            data["is_favorited"] = data["id"] in interactions.favorites
+        if "is_in_shopping_cart" in data:
+            data["is_in_shopping_cart"] = (
+                data["id"] in interactions.shopping_cart
+            )
+        if "author" in data:
+            data["author"] = dict(
+                data["author"],
+                is_subscribed=data["author"]["id"] in interactions.following,
+            )
+        return data
+
+    def to_representation(self, instance):
+        key = self.fragment_key(instance)
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = self.to_fragment(instance)
+            cache.set(key, fragment, settings.RECIPE_FRAGMENT_TTL)
+        return self.with_user_flags(fragment)
 
     def get_is_favorited(self, obj):
-        user = self.context.get("request").user
-        if not user.is_anonymous:
-            return Favorite.objects.filter(recipe=obj, author=user).exists()
-        return False
+        return obj.id in (
+            get_interactions(self.context.get("request")).favorites
+        )
 
     def get_is_in_shopping_cart(self, obj):
-        user = self.context.get("request").user
-        if not user.is_anonymous:
-            return ShoppingCart.objects.filter(
-                recipe=obj, author=user
-            ).exists()
-        return False
+        return obj.id in (
+            get_interactions(self.context.get("request")).shopping_cart
+        )
 
 
 class RecipeCreateUpdateDeleteSerilizer(serializers.ModelSerializer):
@@ -182,18 +301,14 @@ class RecipeCreateUpdateDeleteSerilizer(serializers.ModelSerializer):
         )
 
     def get_is_favorited(self, obj):
-        user = self.context.get("request").user
-        if not user.is_anonymous:
-            return Favorite.objects.filter(recipe=obj, author=user).exists()
-        return False
+        return obj.id in (
+            get_interactions(self.context.get("request")).favorites
+        )
 
     def get_is_in_shopping_cart(self, obj):
-        user = self.context.get("request").user
-        if not user.is_anonymous:
-            return ShoppingCart.objects.filter(
-                recipe=obj, author=user
-            ).exists()
-        return False
+        return obj.id in (
+            get_interactions(self.context.get("request")).shopping_cart
+        )
 
     def validate_tags(self, value):
         if not value:
@@ -249,6 +364,7 @@ class RecipeCreateUpdateDeleteSerilizer(serializers.ModelSerializer):
         self.add_ingredients(ingredients, recipe)
         recipe.tags.set(tags_data)
         recipe.save()
+        feed.fan_out.delay(recipe.id, author.id)
         return recipe
 
     @transaction.atomic
@@ -281,9 +397,12 @@ class RecipeMiniSerializer(serializers.ModelSerializer):
             "cooking_time",
             "image",
         )
+        list_serializer_class = compiled.RecipeMiniListSerializer
 
 
-class SubscribeListCreateDeleteSerializer(serializers.ModelSerializer):
+class SubscribeListCreateDeleteSerializer(
+    SparseFieldsMixin, serializers.ModelSerializer
+):
     """Serializer для модели Subscribe."""
 
     email = serializers.ReadOnlyField(source="author.email")
@@ -311,6 +430,7 @@ class SubscribeListCreateDeleteSerializer(serializers.ModelSerializer):
             "recipes_count",
             "avatar",
         )
+        list_serializer_class = compiled.SubscribeListSerializer
 
     def get_is_subscribed(self, obj):
         user = self.context.get("request").user
@@ -362,6 +482,14 @@ class ShortLinkSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         long_url = validated_data["long_url"]
         short_url, created = ShortLink.objects.get_or_create(long_url=long_url)
+        if not short_url.is_active:
+            # Ссылку отключил sweep_short_links: включаем её снова
+            # и отсчитываем срок без переходов заново
+            short_url.is_active = True
+            short_url.last_clicked_at = timezone.now()
+            ShortLink.objects.filter(id=short_url.id).update(
+                is_active=True, last_clicked_at=short_url.last_clicked_at
+            )
         if created:
             status_code = status.HTTP_200_OK
         else:
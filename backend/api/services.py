@@ -1,11 +1,13 @@
 from datetime import date
 
 from django.db.models import Sum
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect
 
 from food.models import IngredientRecipe, ShortLink
 
+from . import clicks
+
 
 def shopping_cart(self, request, author):
     """Скачивание списка продуктов для выбранных рецептов пользователя."""
@@ -34,11 +36,14 @@ def shopping_cart(self, request, author):
 
 
 def get_long_url(short_url):
-    """Получение полной ссылки"""
+    """Получение полной ссылки с учётом перехода"""
     try:
-        object = ShortLink.objects.get(short_url=short_url)
+        object = ShortLink.objects.only("id", "long_url").get(
+            short_url=short_url, is_active=True
+        )
     except ShortLink.DoesNotExist:
         raise KeyError("No such url")
+    clicks.record(object.id)
     return object.long_url
 
 
@@ -47,5 +52,5 @@ def redirection(request, short_url):
     try:
         long_url = get_long_url(request.build_absolute_uri())
         return redirect(long_url)
-    except Exception as e:
-        raise HttpResponse(e.args)
+    except KeyError as e:
+        raise Http404(e.args)
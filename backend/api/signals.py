@@ -0,0 +1,134 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save, pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from food.models import Ingredient, IngredientRecipe, Recipe, Tag
+from users.models import User
+
+from . import constants, media, pantry
+from .authentication import token_cache
+from .cache import bump_version
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Сброс кеша токена при выходе пользователя (djoser token/logout)."""
+    token_cache.delete(instance.key)
+
+
+def is_last_login_update(update_fields):
+    return update_fields is not None and set(update_fields) == {"last_login"}
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, update_fields=None, **kwargs):
+    """Сброс кеша токенов при изменении пользователя."""
+    if is_last_login_update(update_fields):
+        return
+    for key in Token.objects.filter(user=instance).values_list(
+        "key", flat=True
+    ):
+        token_cache.delete(key)
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def bump_tags_version(sender, **kwargs):
+    bump_version(constants.CACHE_TAGS)
+    bump_version(constants.CACHE_RECIPES)
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def bump_ingredients_version(sender, **kwargs):
+    bump_version(constants.CACHE_INGREDIENTS)
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=IngredientRecipe)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def bump_recipes_version(sender, **kwargs):
+    """Рецепты, их состав и теги изменились – сброс кеша рецептов."""
+    bump_version(constants.CACHE_RECIPES)
+
+
+@receiver(post_save, sender=User)
+def bump_recipes_version_on_author_change(
+    sender, update_fields=None, **kwargs
+):
+    """Данные автора входят в ответы с рецептами."""
+    if not is_last_login_update(update_fields):
+        bump_version(constants.CACHE_RECIPES)
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def refresh_pantry_recipe(sender, instance, **kwargs):
+    pantry.refresh_recipe(instance.id)
+
+
+@receiver((post_save, post_delete), sender=IngredientRecipe)
+def refresh_pantry_ingredients(sender, instance, **kwargs):
+    pantry.refresh_recipe(instance.recipe_id)
+
+
+def touch_recipes(**lookups):
+    """
+    Смена updated_at рецептов: ключи кеша фрагментов
+    и пересчёт похожих рецептов строятся по этому полю.
+    """
+    Recipe.objects.filter(**lookups).update(updated_at=timezone.now())
+
+
+@receiver((post_save, post_delete), sender=IngredientRecipe)
+def touch_recipe_on_ingredients_change(sender, instance, **kwargs):
+    touch_recipes(pk=instance.recipe_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def touch_recipe_on_tags_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        touch_recipes(pk=instance.pk)
+    elif reverse and action in ("post_add", "post_remove"):
+        touch_recipes(pk__in=pk_set)
+    elif reverse and action == "pre_clear":
+        touch_recipes(tags=instance)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def touch_recipes_on_tag_change(sender, instance, **kwargs):
+    touch_recipes(tags=instance)
+
+
+@receiver(post_save, sender=Ingredient)
+def touch_recipes_on_ingredient_change(sender, instance, **kwargs):
+    touch_recipes(ingredients=instance)
+
+
+@receiver(post_save, sender=User)
+def touch_recipes_on_author_change(
+    sender, instance, update_fields=None, **kwargs
+):
+    if not is_last_login_update(update_fields):
+        touch_recipes(author=instance)
+
+
+@receiver(post_init, sender=Recipe)
+@receiver(post_init, sender=User)
+def remember_media_names(sender, instance, **kwargs):
+    media.remember(instance)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=User)
+def count_media_references(sender, instance, created, **kwargs):
+    """Учёт ссылок на файлы картинок для сборки мусора gc_media."""
+    media.saved(instance, created)
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=User)
+def release_media_references(sender, instance, **kwargs):
+    media.deleted(instance)
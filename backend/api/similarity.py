@@ -0,0 +1,131 @@
+"""
+Похожие рецепты по составу: разреженная матрица рецепт × ингредиент
+и пакетный расчёт k ближайших соседей по мере Жаккара или косинусной.
+"""
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Min
+from scipy import sparse
+
+from food.models import IngredientRecipe, SimilarRecipe
+
+from . import constants
+
+
+class RecipeMatrix:
+    """Бинарная CSR-матрица состава рецептов."""
+
+    def __init__(self):
+        pairs = np.array(
+            IngredientRecipe.objects.values_list("recipe_id", "ingredient_id"),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        self.recipe_ids = np.unique(pairs[:, 0])
+        ingredient_ids = np.unique(pairs[:, 1])
+        self.matrix = sparse.csr_matrix(
+            (
+                np.ones(len(pairs), dtype=np.float32),
+                (
+                    np.searchsorted(self.recipe_ids, pairs[:, 0]),
+                    np.searchsorted(ingredient_ids, pairs[:, 1]),
+                ),
+            ),
+            shape=(len(self.recipe_ids), len(ingredient_ids)),
+        )
+        self.sizes = np.asarray(self.matrix.sum(axis=1)).ravel()
+
+    def rows(self, recipe_ids):
+        """Номера строк матрицы для рецептов, которые в ней есть."""
+        recipe_ids = np.asarray(list(recipe_ids), dtype=np.int64)
+        if not len(recipe_ids) or not len(self.recipe_ids):
+            return np.array([], dtype=np.int64)
+        positions = np.minimum(
+            np.searchsorted(self.recipe_ids, recipe_ids),
+            len(self.recipe_ids) - 1,
+        )
+        return np.unique(positions[self.recipe_ids[positions] == recipe_ids])
+
+    def scores(self, rows, metric):
+        """
+        Схожесть строк rows со всеми рецептами (кроме самих себя):
+        массивы (номер в rows, столбец, схожесть) ненулевых пар.
+        """
+        common = (self.matrix[rows] @ self.matrix.T).tocoo()
+        batch, columns = common.row, common.col
+        counts = common.data.astype(np.float64)
+        keep = rows[batch] != columns
+        batch, columns, counts = batch[keep], columns[keep], counts[keep]
+        own, other = self.sizes[rows[batch]], self.sizes[columns]
+        if metric == constants.SIMILARITY_COSINE:
+            scores = counts / np.sqrt(own * other)
+        else:
+            scores = counts / (own + other - counts)
+        return batch, columns, scores
+
+    def top_k(self, rows, metric, k):
+        """k соседей с наибольшей схожестью для каждой строки rows."""
+        batch, columns, scores = self.scores(rows, metric)
+        # Порядок: строка, убывание схожести, более новые рецепты выше
+        order = np.lexsort((-columns, -scores, batch))
+        batch, columns, scores = batch[order], columns[order], scores[order]
+        position = np.arange(len(batch)) - np.searchsorted(batch, batch)
+        keep = position < k
+        return (
+            self.recipe_ids[rows[batch[keep]]],
+            self.recipe_ids[columns[keep]],
+            scores[keep],
+        )
+
+
+def save_neighbours(matrix, rows, metric, k):
+    """Пересчёт и сохранение соседей для строк rows пакетами."""
+    for start in range(0, len(rows), constants.SIMILARITY_BATCH_SIZE):
+        batch = rows[start:start + constants.SIMILARITY_BATCH_SIZE]
+        recipes, similar, scores = matrix.top_k(batch, metric, k)
+        with transaction.atomic():
+            SimilarRecipe.objects.filter(
+                recipe_id__in=matrix.recipe_ids[batch].tolist()
+            ).delete()
+            SimilarRecipe.objects.bulk_create(
+                SimilarRecipe(
+                    recipe_id=recipe_id, similar_id=similar_id, score=score
+                )
+                for recipe_id, similar_id, score in zip(
+                    recipes.tolist(), similar.tolist(), scores.tolist()
+                )
+            )
+
+
+def affected_rows(matrix, changed, metric, k):
+    """
+    Строки, списки соседей которых могут измениться из-за рецептов
+    changed: сами рецепты, рецепты, у которых они в списке соседей,
+    и рецепты, в топ которых они теперь попадают.
+    """
+    rows = matrix.rows(changed)
+    holders = matrix.rows(
+        SimilarRecipe.objects.filter(similar_id__in=changed).values_list(
+            "recipe_id", flat=True
+        )
+    )
+    # Порог попадания в топ: k-я схожесть, 0 если соседей меньше k
+    threshold = np.zeros(len(matrix.recipe_ids))
+    lowest = np.array(
+        SimilarRecipe.objects.values("recipe_id")
+        .annotate(lowest=Min("score"), total=Count("id"))
+        .filter(total__gte=k)
+        .order_by("recipe_id")
+        .values_list("recipe_id", "lowest"),
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    listed = matrix.rows(lowest[:, 0].astype(np.int64))
+    threshold[listed] = lowest[
+        np.isin(lowest[:, 0], matrix.recipe_ids[listed]), 1
+    ]
+    affected = [rows, holders]
+    for start in range(0, len(rows), constants.SIMILARITY_BATCH_SIZE):
+        _, columns, scores = matrix.scores(
+            rows[start:start + constants.SIMILARITY_BATCH_SIZE], metric
+        )
+        affected.append(columns[scores > threshold[columns]])
+    return np.unique(np.concatenate(affected)).astype(np.int64)
@@ -0,0 +1,171 @@
+"""
+Очередь фоновых задач в таблице Task без отдельного брокера.
+Задача ставится в очередь в той же транзакции, что и данные запроса,
+воркеры (run_worker) забирают её через SELECT ... FOR UPDATE SKIP LOCKED.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from food.models import Task
+
+logger = logging.getLogger(__name__)
+
+
+def task(max_attempts=None):
+    """
+    Функция, которую можно выполнить в фоне:
+    func.delay(*args, **kwargs) – в очередь сразу,
+    func.schedule(run_at или countdown, *args, **kwargs) – позже.
+    Аргументы должны сериализоваться в JSON.
+    """
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        attempts = max_attempts or settings.TASK_MAX_ATTEMPTS
+
+        def delay(*args, **kwargs):
+            return enqueue(name, args, kwargs, max_attempts=attempts)
+
+        def schedule(when, *args, **kwargs):
+            return enqueue(name, args, kwargs, when, max_attempts=attempts)
+
+        func.delay = delay
+        func.schedule = schedule
+        return func
+
+    return decorator
+
+
+def enqueue(name, args=(), kwargs=None, when=None, max_attempts=None):
+    """Постановка задачи; when – datetime или задержка в секундах."""
+    if when is None:
+        run_at = timezone.now()
+    elif isinstance(when, (int, float)):
+        run_at = timezone.now() + timedelta(seconds=when)
+    else:
+        run_at = when
+    return Task.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        run_at=run_at,
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+    )
+
+
+def claim(batch_size):
+    """
+    Готовые к запуску задачи, недоступные другим воркерам.
+    started_at – метка захвата: задача, которую requeue_stale вернула
+    в очередь и забрал другой воркер, получает новую метку.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status=Task.PENDING, run_at__lte=now)
+            .order_by("run_at")[:batch_size]
+        )
+        Task.objects.filter(id__in=[obj.id for obj in tasks]).update(
+            status=Task.RUNNING, started_at=now
+        )
+    for obj in tasks:
+        obj.status, obj.started_at = Task.RUNNING, now
+    return tasks
+
+
+def start(obj):
+    """
+    Отметка о начале выполнения: своя метка времени и попытка,
+    засчитанная до запуска (задача, убивающая воркер, не повторяется
+    бесконечно). False, если задачу уже вернули в очередь.
+    """
+    now = timezone.now()
+    if not Task.objects.filter(
+        id=obj.id, status=Task.RUNNING, started_at=obj.started_at
+    ).update(started_at=now, attempts=F("attempts") + 1):
+        return False
+    obj.started_at = now
+    obj.attempts += 1
+    return True
+
+
+def backoff(attempts):
+    return timedelta(seconds=settings.TASK_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def execute(obj):
+    """Выполнение задачи; при ошибке – повтор с растущей задержкой."""
+    if not start(obj):
+        return False
+    # Итог записывается, только если задачу не вернули в очередь
+    owned = Task.objects.filter(id=obj.id, started_at=obj.started_at)
+    try:
+        import_string(obj.name)(*obj.args, **obj.kwargs)
+    except Exception:
+        logger.exception("Ошибка задачи %s #%s", obj.name, obj.id)
+        now = timezone.now()
+        retry = obj.attempts < obj.max_attempts
+        owned.update(
+            status=Task.PENDING if retry else Task.FAILED,
+            run_at=now + backoff(obj.attempts) if retry else obj.run_at,
+            last_error=traceback.format_exc(),
+            finished_at=None if retry else now,
+        )
+        return False
+    owned.update(status=Task.DONE, finished_at=timezone.now())
+    return True
+
+
+def requeue_stale():
+    """
+    Возврат в очередь задач, не завершённых за TASK_TIMEOUT после
+    захвата или начала выполнения (воркер упал или убит). Попытка уже
+    засчитана в start, исчерпавшие попытки задачи завершаются ошибкой.
+    """
+    now = timezone.now()
+    stale = Task.objects.filter(
+        status=Task.RUNNING,
+        started_at__lt=now - timedelta(seconds=settings.TASK_TIMEOUT),
+    )
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Task.FAILED,
+        finished_at=now,
+        last_error="Задача не завершилась за TASK_TIMEOUT",
+    )
+    return failed + stale.update(status=Task.PENDING, run_at=now)
+
+
+def purge(days):
+    """Удаление выполненных задач старше days дней."""
+    return Task.objects.filter(
+        status=Task.DONE,
+        finished_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()[0]
+
+
+def stats(since):
+    """Метрики очереди: выполнено и ошибок с since, ожидают, задержка."""
+    now = timezone.now()
+    finished = Task.objects.filter(finished_at__gte=since)
+    oldest = (
+        Task.objects.filter(status=Task.PENDING, run_at__lte=now)
+        .order_by("run_at")
+        .values_list("run_at", flat=True)
+        .first()
+    )
+    return {
+        "done": finished.filter(status=Task.DONE).count(),
+        "failed": finished.filter(status=Task.FAILED).count(),
+        "pending": Task.objects.filter(
+            status=Task.PENDING, run_at__lte=now
+        ).count(),
+        "lag": (now - oldest).total_seconds() if oldest else 0,
+    }
@@ -0,0 +1,29 @@
+"""Версии наборов данных (api.cache) не уменьшаются после вытеснения."""
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from api.cache import bump_version, get_version, version_key
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+)
+class VersionTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_versions_grow_after_eviction(self):
+        version = get_version("recipes")
+        self.assertEqual(get_version("recipes"), version)
+        for _ in range(3):
+            self.assertGreater(bump_version("recipes"), version)
+            version = get_version("recipes")
+        cache.delete(version_key("recipes"))
+        self.assertGreater(get_version("recipes"), version)
+        version = get_version("recipes")
+        cache.delete(version_key("recipes"))
+        self.assertGreater(bump_version("recipes"), version)
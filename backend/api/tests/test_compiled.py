@@ -0,0 +1,200 @@
+"""
+Быстрые сериализаторы списков (api.compiled) дают те же байты ответа,
+что и обычные сериализаторы, применённые к каждому объекту, а список
+подписок – что и ответ, собранный по данным моделей.
+"""
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from api import compiled
+from api.serializers import (IngredientSerializer, RecipeListSerializer,
+                             RecipeMiniSerializer,
+                             SubscribeListCreateDeleteSerializer)
+from food.models import Ingredient, IngredientRecipe, Recipe, Subscribe, Tag
+from users.models import User
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+)
+class CompiledSerializersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="reader",
+            email="reader@example.com",
+            password="password",
+            first_name="Читатель",
+            last_name="Рецептов",
+        )
+        tags = [
+            Tag.objects.create(name=f"Тег {number}", slug=f"tag-{number}")
+            for number in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f"Ингредиент {number}", measurement_unit="г"
+            )
+            for number in range(4)
+        ]
+        # Авторы без рецептов, с рецептами меньше и больше recipes_limit
+        for number, recipes in enumerate((0, 2, 5)):
+            author = User.objects.create_user(
+                username=f"author{number}",
+                email=f"author{number}@example.com",
+                password="password",
+                first_name="Автор",
+                last_name=str(number),
+                avatar=f"users/{number}.png" if number else None,
+            )
+            Subscribe.objects.create(user=cls.user, author=author)
+            for index in range(recipes):
+                recipe = Recipe.objects.create(
+                    author=author,
+                    name=f"Рецепт {number}-{index}",
+                    image=f"media/{number}-{index}.png",
+                    text="Описание",
+                    cooking_time=index + 1,
+                )
+                recipe.tags.set(tags[: index % 3 + 1])
+                for ingredient in ingredients[: index % 4 + 1]:
+                    IngredientRecipe.objects.create(
+                        recipe=recipe, ingredient=ingredient, amount=index + 1
+                    )
+
+    def setUp(self):
+        cache.clear()
+
+    def request(self, **params):
+        request = Request(
+            RequestFactory().get("/api/", params, HTTP_HOST="testserver")
+        )
+        request.user = self.user
+        return request
+
+    def assertSameOutput(self, serializer, objects, request):
+        context = {"request": request}
+        child = serializer(context=context)
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(
+                serializer(objects, many=True, context=context).data
+            ),
+            renderer.render([child.to_representation(obj) for obj in objects]),
+        )
+
+    def test_ingredients(self):
+        self.assertSameOutput(
+            IngredientSerializer, Ingredient.objects.all(), self.request()
+        )
+
+    def test_recipes_mini(self):
+        self.assertSameOutput(
+            RecipeMiniSerializer, Recipe.objects.all(), self.request()
+        )
+
+    def expected_subscriptions(self, request):
+        """
+        Ответ подписок, собранный по данным моделей без сериализаторов:
+        get_recipes самого сериализатора идёт через api.compiled.
+        """
+        limit = request.GET.get("recipes_limit")
+        fields = SubscribeListCreateDeleteSerializer(
+            context={"request": request}
+        ).fields
+        result = []
+        for subscribe in Subscribe.objects.filter(user=self.user):
+            author = subscribe.author
+            recipes = Recipe.objects.filter(author=author).order_by("-id")
+            item = {
+                "id": author.id,
+                "username": author.username,
+                "first_name": author.first_name,
+                "last_name": author.last_name,
+                "email": author.email,
+                "is_subscribed": True,
+                "recipes": [
+                    {
+                        "id": recipe.id,
+                        "name": recipe.name,
+                        "cooking_time": recipe.cooking_time,
+                        "image": recipe.image.url,
+                    }
+                    for recipe in (
+                        recipes[: int(limit)]
+                        if limit and limit.isdigit()
+                        else recipes
+                    )
+                ],
+                "recipes_count": recipes.count(),
+                "avatar": (
+                    request.build_absolute_uri(author.avatar.url)
+                    if author.avatar
+                    else None
+                ),
+            }
+            result.append({name: item[name] for name in fields})
+        return result
+
+    def test_subscriptions(self):
+        renderer = JSONRenderer()
+        for params in (
+            {},
+            {"recipes_limit": "0"},
+            {"recipes_limit": "1"},
+            {"recipes_limit": "3"},
+            {"recipes_limit": "10"},
+            {"recipes_limit": "abc"},
+            {"omit": "recipes"},
+            {"fields": "id,recipes_count"},
+        ):
+            with self.subTest(**params):
+                request = self.request(**params)
+                self.assertEqual(
+                    renderer.render(
+                        SubscribeListCreateDeleteSerializer(
+                            Subscribe.objects.filter(user=self.user),
+                            many=True,
+                            context={"request": request},
+                        ).data
+                    ),
+                    renderer.render(self.expected_subscriptions(request)),
+                )
+
+    def test_recipes(self):
+        Subscribe.objects.filter(author__username="author2").delete()
+        for params in ({}, {"fields": "id,author,tags"}, {"omit": "text"}):
+            with self.subTest(**params):
+                request = self.request(**params)
+                child = RecipeListSerializer(context={"request": request})
+                recipes = list(
+                    Recipe.objects.prefetch_related(
+                        "author", "tags", "recipe_ingredients__ingredient"
+                    )
+                )
+                fragments = compiled.recipe_fragments(
+                    [recipe.id for recipe in recipes],
+                    request,
+                    tuple(child.fields),
+                )
+                renderer = JSONRenderer()
+                self.assertEqual(
+                    renderer.render(
+                        [
+                            child.with_user_flags(fragments[recipe.id])
+                            for recipe in recipes
+                        ]
+                    ),
+                    renderer.render(
+                        [
+                            child.with_user_flags(child.to_fragment(recipe))
+                            for recipe in recipes
+                        ]
+                    ),
+                )
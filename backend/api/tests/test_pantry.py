@@ -0,0 +1,94 @@
+"""
+Поиск рецептов по имеющимся ингредиентам с фильтрами списка рецептов:
+фильтры применяются до ранжирования, без списка всех найденных id.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from food.models import Ingredient, IngredientRecipe, Recipe, Tag
+from users.models import User
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+)
+class PantryTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username="author",
+            email="author@example.com",
+            password="password",
+            first_name="Автор",
+            last_name="Рецептов",
+        )
+        cls.tag = Tag.objects.create(name="Завтрак", slug="breakfast")
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f"Ингредиент {number}", measurement_unit="г"
+            )
+            for number in range(3)
+        ]
+        # Рецепт i состоит из ингредиентов 0..i, чётные – с тегом
+        cls.recipes = []
+        for number in range(3):
+            recipe = Recipe.objects.create(
+                author=author,
+                name=f"Рецепт {number}",
+                image=f"media/{number}.png",
+                text="Описание",
+                cooking_time=10,
+            )
+            if number % 2 == 0:
+                recipe.tags.add(cls.tag)
+            for ingredient in cls.ingredients[: number + 1]:
+                IngredientRecipe.objects.create(
+                    recipe=recipe, ingredient=ingredient, amount=1
+                )
+            cls.recipes.append(recipe)
+
+    def setUp(self):
+        cache.clear()
+
+    def pantry(self, **params):
+        params.setdefault("ingredients", [self.ingredients[0].id])
+        response = APIClient().get("/api/recipes/pantry/", params)
+        self.assertEqual(response.status_code, 200)
+        return [
+            (recipe["id"], recipe["missing_ingredients"])
+            for recipe in response.json()["results"]
+        ]
+
+    def test_ranking(self):
+        self.assertEqual(
+            self.pantry(),
+            [
+                (self.recipes[0].id, 0),
+                (self.recipes[1].id, 1),
+                (self.recipes[2].id, 2),
+            ],
+        )
+        self.assertEqual(
+            self.pantry(max_missing=1),
+            [(self.recipes[0].id, 0), (self.recipes[1].id, 1)],
+        )
+
+    def test_filters(self):
+        self.pantry()
+        with CaptureQueriesContext(connection) as queries:
+            found = self.pantry(tags=self.tag.slug)
+        self.assertEqual(
+            found, [(self.recipes[0].id, 0), (self.recipes[2].id, 2)]
+        )
+        # Найденные индексом id в запросы не попадают
+        ids = ", ".join(str(recipe.id) for recipe in self.recipes)
+        self.assertFalse(
+            any(ids in query["sql"] for query in queries.captured_queries)
+        )
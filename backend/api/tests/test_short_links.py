@@ -0,0 +1,83 @@
+"""
+Короткая ссылка, отключённая sweep_short_links, снова работает
+после повторного запроса get-link.
+"""
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import clicks
+from food.models import Recipe, ShortLink
+from users.models import User
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+)
+class ShortLinkSweepTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username="author",
+            email="author@example.com",
+            password="password",
+            first_name="Автор",
+            last_name="Рецепта",
+        )
+        cls.recipe = Recipe.objects.create(
+            author=author,
+            name="Рецепт",
+            image="media/recipe.png",
+            text="Описание",
+            cooking_time=10,
+        )
+
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        throttle = override_settings(
+            THROTTLE_FILE=str(Path(directory.name) / "throttle")
+        )
+        throttle.enable()
+        self.addCleanup(throttle.disable)
+        self.client = APIClient(HTTP_HOST="localhost")
+        # Переходы копятся в буфере процесса, пишем их до отката теста
+        self.addCleanup(clicks.flush)
+
+    def get_link(self):
+        response = self.client.get(f"/api/recipes/{self.recipe.id}/get-link/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["short-link"]
+
+    def redirect(self, short_link):
+        return self.client.get(short_link.replace("http://localhost", ""))
+
+    def test_get_link_after_sweep(self):
+        short_link = self.get_link()
+        self.assertEqual(self.redirect(short_link).status_code, 302)
+        ShortLink.objects.update(
+            created_at=timezone.now() - timedelta(days=400),
+            last_clicked_at=timezone.now() - timedelta(days=400),
+        )
+        call_command("sweep_short_links", stdout=StringIO())
+        self.assertEqual(self.redirect(short_link).status_code, 404)
+
+        self.assertEqual(self.get_link(), short_link)
+        response = self.redirect(short_link)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            response["Location"], f"http://localhost/recipes/{self.recipe.id}/"
+        )
+        # Срок без переходов отсчитывается заново
+        call_command("sweep_short_links", stdout=StringIO())
+        self.assertEqual(self.redirect(short_link).status_code, 302)
@@ -0,0 +1,103 @@
+"""
+Token bucket (api.throttling): всплеск до ёмкости корзины, равномерное
+пополнение и общий лимит для параллельных процессов и потоков.
+"""
+import multiprocessing
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, override_settings
+
+from api.throttling import TokenBucketThrottle
+
+
+class Throttle(TokenBucketThrottle):
+    THROTTLE_RATES = {"test": "5/min"}
+    now = 1000.0
+
+    def timer(self):
+        return self.now
+
+
+def make_request(user_id=1):
+    return SimpleNamespace(
+        user=SimpleNamespace(is_authenticated=True, pk=user_id), META={}
+    )
+
+
+VIEW = SimpleNamespace(action="create", throttle_scopes={"create": "test"})
+
+
+def allowed_requests(count, rate="1000/day"):
+    """Сколько из count запросов одного пользователя пропущено."""
+    throttle = Throttle()
+    throttle.THROTTLE_RATES = {"test": rate}
+    return sum(
+        throttle.allow_request(make_request(), VIEW) for _ in range(count)
+    )
+
+
+class TokenBucketThrottleTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            THROTTLE_FILE=str(Path(directory.name) / "throttle"),
+            THROTTLE_SLOTS=64,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_burst_and_refill(self):
+        throttle = Throttle()
+        request = make_request()
+        for _ in range(5):
+            self.assertTrue(throttle.allow_request(request, VIEW))
+        self.assertFalse(throttle.allow_request(request, VIEW))
+        # Токен появляется раз в 12 секунд
+        self.assertAlmostEqual(throttle.wait(), 12)
+        throttle.now += 6
+        self.assertFalse(throttle.allow_request(request, VIEW))
+        self.assertAlmostEqual(throttle.wait(), 6)
+        throttle.now += 6
+        self.assertTrue(throttle.allow_request(request, VIEW))
+        self.assertFalse(throttle.allow_request(request, VIEW))
+        # Корзина пополняется не больше ёмкости
+        throttle.now += 3600
+        for _ in range(5):
+            self.assertTrue(throttle.allow_request(request, VIEW))
+        self.assertFalse(throttle.allow_request(request, VIEW))
+
+    def test_separate_buckets(self):
+        throttle = Throttle()
+        for _ in range(5):
+            throttle.allow_request(make_request(1), VIEW)
+        self.assertFalse(throttle.allow_request(make_request(1), VIEW))
+        self.assertTrue(throttle.allow_request(make_request(2), VIEW))
+        # Действие без scope не ограничивается
+        other = SimpleNamespace(action="list", throttle_scopes={})
+        self.assertTrue(throttle.allow_request(make_request(1), other))
+
+    def test_parallel_processes(self):
+        context = multiprocessing.get_context("fork")
+        with context.Pool(8) as pool:
+            allowed = pool.starmap(
+                allowed_requests, [(200, "500/day")] * 8
+            )
+        self.assertEqual(sum(allowed), 500)
+
+    def test_parallel_threads(self):
+        allowed = []
+        threads = [
+            threading.Thread(
+                target=lambda: allowed.append(allowed_requests(200, "500/day"))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(allowed), 500)
@@ -0,0 +1,138 @@
+import fcntl
+import mmap
+import os
+import struct
+import threading
+from hashlib import blake2b
+
+from django.conf import settings
+from rest_framework.throttling import ScopedRateThrottle
+
+# Ячейка файла корзин: хеш ключа, число токенов, время обновления
+SLOT = struct.Struct("=Qdd")
+# Ключ ищется только среди ячеек своего набора
+SET_SIZE = 4
+
+
+class BucketStore:
+    """
+    Корзины token bucket в файле, отображённом в память (mmap):
+    все воркеры gunicorn на хосте видят одни и те же корзины без
+    сетевого сервиса. Файл – таблица ячеек, ключ попадает в набор
+    из SET_SIZE ячеек по хешу; если в наборе нет места, вытесняется
+    корзина, которая дольше всех не обновлялась (за duration она
+    и так пополнилась бы целиком). Набор читается и записывается
+    под блокировкой fcntl его байтов в файле – между процессами – и
+    threading.Lock между потоками: блокировки fcntl принадлежат
+    процессу и потоки одного процесса не разделяют.
+    """
+
+    def __init__(self, path, slots):
+        self.path = path
+        self.sets = max(slots // SET_SIZE, 1)
+        self.set_bytes = SET_SIZE * SLOT.size
+        self.lock = threading.Lock()
+        self.memory = None
+
+    def open(self):
+        size = self.sets * self.set_bytes
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.memory = mmap.mmap(self.fd, size)
+
+    def take(self, key, capacity, rate, now):
+        """
+        Взять токен из корзины key ёмкостью capacity, которая
+        пополняется на rate токенов в секунду.
+        Возвращает (взят ли токен, сколько токенов осталось).
+        """
+        digest = int.from_bytes(
+            blake2b(key.encode(), digest_size=8).digest(), "little"
+        )
+        # Нулевой хеш – признак пустой ячейки
+        digest = digest or 1
+        start = digest % self.sets * self.set_bytes
+        with self.lock:
+            if self.memory is None:
+                self.open()
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, self.set_bytes, start)
+            try:
+                slots = [
+                    SLOT.unpack_from(self.memory, start + offset)
+                    for offset in range(0, self.set_bytes, SLOT.size)
+                ]
+                for index, (slot_digest, tokens, updated) in enumerate(slots):
+                    if slot_digest == digest:
+                        tokens = min(
+                            capacity, tokens + max(now - updated, 0) * rate
+                        )
+                        break
+                else:
+                    index = min(
+                        range(SET_SIZE), key=lambda number: slots[number][2]
+                    )
+                    tokens = capacity
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                SLOT.pack_into(
+                    self.memory,
+                    start + index * SLOT.size,
+                    digest,
+                    tokens,
+                    now,
+                )
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, self.set_bytes, start)
+        return allowed, tokens
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """Хранилище корзин процесса для THROTTLE_FILE."""
+    key = (settings.THROTTLE_FILE, settings.THROTTLE_SLOTS)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = BucketStore(*key)
+        return _stores[key]
+
+
+class TokenBucketThrottle(ScopedRateThrottle):
+    """
+    Ограничение частоты запросов к действиям вьюсета по алгоритму
+    token bucket. Область задаётся словарём throttle_scopes вьюсета
+    (действие -> scope), лимиты – DEFAULT_THROTTLE_RATES: ёмкость
+    корзины и время её полного пополнения. Корзины хранятся
+    в BucketStore, поэтому проверка O(1) и не теряет запросы
+    параллельных воркеров.
+    """
+
+    scope_attr = "throttle_scopes"
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def allow_request(self, request, view):
+        scopes = getattr(view, self.scope_attr, {})
+        self.scope = scopes.get(getattr(view, "action", None))
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        # Корзина пополняется равномерно: num_requests токенов за duration
+        self.refill_rate = self.num_requests / self.duration
+        allowed, self.tokens = get_store().take(
+            self.get_cache_key(request, view),
+            self.num_requests,
+            self.refill_rate,
+            self.timer(),
+        )
+        if not allowed:
+            return self.throttle_failure()
+        return True
+
+    def wait(self):
+        """Секунды до появления следующего токена (Retry-After)."""
+        return (1 - self.tokens) / self.refill_rate
@@ -1,26 +1,33 @@
 from urllib.parse import urlparse, urlunparse
 
+from django.db.models import Exists, OuterRef
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.pagination import LimitOffsetPagination
-from rest_framework.permissions import SAFE_METHODS, AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api.cache import cache_anonymous_response
 from api.filters import IngredientSearchFilter, RecipeFilter
 from api.permissions import IsAdminIsAuthorOrReadOnly
 from api.services import shopping_cart
-from food.models import (Favorite, Ingredient, Recipe, ShoppingCart, Subscribe,
-                         Tag, User)
+from food.models import (Favorite, Ingredient, IngredientRecipe, Recipe,
+                         ShoppingCart, Subscribe, Tag, User)
 
+from . import constants, fieldsets, interactions
 from .constants import API_POS, GET_LINK_POS
+from .feed import get_feed
 from .mixins import ListRetrieveViewSet
+from .pagination import FeedPagination, RankingPagination
+from .pantry import get_index
 from .serializers import (FavoriteSerializer, IngredientSerializer,
+                          PantrySerializer, RecipeBulkSerializer,
                           RecipeCreateUpdateDeleteSerilizer,
-                          RecipeListSerializer, ShoppingCartSerializer,
-                          ShortLinkSerializer,
+                          RecipeListSerializer, RecipeMiniSerializer,
+                          ShoppingCartSerializer, ShortLinkSerializer,
                           SubscribeListCreateDeleteSerializer, TagSerializer)
 
 
@@ -40,7 +47,6 @@ class IngredientViewSet(ListRetrieveViewSet):
     serializer_class = IngredientSerializer
     permission_classes = (AllowAny,)
     filter_backends = (IngredientSearchFilter,)
-    search_fields = ("^name",)
     pagination_class = None
 
 
@@ -58,7 +64,30 @@ class RecipeViewSet(viewsets.ModelViewSet):
         ShortLinkSerializer: ("get_link",),
         FavoriteSerializer: ("favorite",),
         ShoppingCartSerializer: ("shopping_cart",),
-        RecipeListSerializer: SAFE_METHODS,
+        RecipeMiniSerializer: ("similar",),
+        RecipeBulkSerializer: (
+            "favorite_bulk",
+            "delete_favorite_bulk",
+            "shopping_cart_bulk",
+            "delete_shopping_cart_bulk",
+        ),
+        RecipeListSerializer: ("list", "retrieve", "feed", "pantry"),
+    }
+
+    throttle_scopes = {
+        "create": "recipe_create",
+        "update": "recipe_create",
+        "partial_update": "recipe_create",
+        "favorite": "favorite",
+        "delete_favorite": "favorite",
+        "favorite_bulk": "favorite",
+        "delete_favorite_bulk": "favorite",
+        "shopping_cart": "shopping_cart",
+        "delete_shopping_cart": "shopping_cart",
+        "shopping_cart_bulk": "shopping_cart",
+        "delete_shopping_cart_bulk": "shopping_cart",
+        "download_shopping_cart": "shopping_cart",
+        "get_link": "get_link",
     }
 
     def get_serializer_class(self):
@@ -67,6 +96,40 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 return serializer
         return RecipeViewSet.serializer_class
 
+    def get_queryset(self):
+        """Столбцы и связи рецептов – только для полей ?fields=/?omit=."""
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            return fieldsets.recipe_queryset(
+                queryset,
+                fieldsets.requested_fields(
+                    self.request, RecipeListSerializer.Meta.fields
+                ),
+                detail=self.action == "retrieve",
+            )
+        return queryset
+
+    @property
+    def paginator(self):
+        """Для ?ordering=popular|trending – постраничный вывод по ключу."""
+        if (
+            not hasattr(self, "_paginator")
+            and self.action == "list"
+            and self.request is not None
+            and self.request.query_params.get("ordering")
+            in constants.RANKINGS
+        ):
+            self._paginator = RankingPagination()
+        return super().paginator
+
+    @cache_anonymous_response(constants.CACHE_RECIPES)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_anonymous_response(constants.CACHE_RECIPES)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @staticmethod
     def create_delete_template(request, pk):
         recipe = get_object_or_404(Recipe, id=pk)
@@ -84,6 +147,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
         serializer = serializers(data=request.data)
         if serializer.is_valid(raise_exception=True):
             serializer.save(author=user, recipe=recipe)
+            interactions.invalidate(user.id)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -92,6 +156,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
         recipe, user = RecipeViewSet.create_delete_template(request, pk)
         if model.objects.filter(author=user, recipe=recipe).exists():
             model.objects.filter(author=user, recipe=recipe).delete()
+            interactions.invalidate(user.id)
             return Response(
                 "Рецепт успешно удалён из списка покупок.",
                 status=status.HTTP_204_NO_CONTENT,
@@ -101,6 +166,71 @@ class RecipeViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    @staticmethod
+    def bulk_template(request, serializers, model):
+        """
+        Проверка списка рецептов одним запросом.
+        Возвращает id рецептов и признак их наличия в списке model.
+        """
+        serializer = serializers(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data["recipes"]
+        added = dict(
+            Recipe.objects.filter(id__in=recipe_ids)
+            .annotate(
+                added=Exists(
+                    model.objects.filter(
+                        author=request.user, recipe=OuterRef("pk")
+                    )
+                )
+            )
+            .values_list("id", "added")
+        )
+        return recipe_ids, added
+
+    @staticmethod
+    def bulk_create_template(request, serializers, model):
+        recipe_ids, added = RecipeViewSet.bulk_template(
+            request, serializers, model
+        )
+        model.objects.bulk_create(
+            [
+                model(author=request.user, recipe_id=recipe_id)
+                for recipe_id, exists in added.items()
+                if not exists
+            ],
+            ignore_conflicts=True,
+        )
+        interactions.invalidate(request.user.id)
+        results = []
+        for recipe_id in recipe_ids:
+            if recipe_id not in added:
+                result = constants.BULK_STATUS_NOT_FOUND
+            elif added[recipe_id]:
+                result = constants.BULK_STATUS_EXISTS
+            else:
+                result = constants.BULK_STATUS_CREATED
+            results.append({"id": recipe_id, "status": result})
+        return Response(results, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def bulk_delete_template(request, serializers, model):
+        recipe_ids, added = RecipeViewSet.bulk_template(
+            request, serializers, model
+        )
+        model.objects.filter(author=request.user, recipe_id__in=added).delete()
+        interactions.invalidate(request.user.id)
+        results = []
+        for recipe_id in recipe_ids:
+            if recipe_id not in added:
+                result = constants.BULK_STATUS_NOT_FOUND
+            elif added[recipe_id]:
+                result = constants.BULK_STATUS_DELETED
+            else:
+                result = constants.BULK_STATUS_MISSING
+            results.append({"id": recipe_id, "status": result})
+        return Response(results, status=status.HTTP_200_OK)
+
     @action(
         detail=True,
         methods=("POST",),
@@ -145,6 +275,126 @@ class RecipeViewSet(viewsets.ModelViewSet):
             request, self.kwargs.get("pk"), ShoppingCart
         )
 
+    @action(
+        detail=False,
+        methods=("POST",),
+        permission_classes=(IsAuthenticated,),
+        url_path="favorite/bulk",
+    )
+    def favorite_bulk(self, request, *args, **kwargs):
+        """Добавить / Удалить список рецептов в избранном за один запрос."""
+        return self.bulk_create_template(
+            request, self.get_serializer_class(), Favorite
+        )
+
+    @favorite_bulk.mapping.delete
+    def delete_favorite_bulk(self, request, *args, **kwargs):
+        return self.bulk_delete_template(
+            request, self.get_serializer_class(), Favorite
+        )
+
+    @action(
+        detail=False,
+        methods=("POST",),
+        permission_classes=(IsAuthenticated,),
+        url_path="shopping_cart/bulk",
+    )
+    def shopping_cart_bulk(self, request, *args, **kwargs):
+        """
+        Добавить / Удалить список рецептов
+        в списке покупок за один запрос.
+        """
+        return self.bulk_create_template(
+            request, self.get_serializer_class(), ShoppingCart
+        )
+
+    @shopping_cart_bulk.mapping.delete
+    def delete_shopping_cart_bulk(self, request, *args, **kwargs):
+        return self.bulk_delete_template(
+            request, self.get_serializer_class(), ShoppingCart
+        )
+
+    @action(
+        detail=False,
+        methods=("GET",),
+        permission_classes=(IsAuthenticated,),
+        pagination_class=FeedPagination,
+    )
+    def feed(self, request):
+        """Рецепты авторов, на которых подписан пользователь."""
+        page = self.paginate_queryset(
+            fieldsets.recipe_queryset(
+                get_feed(request),
+                fieldsets.requested_fields(
+                    request, RecipeListSerializer.Meta.fields
+                ),
+            )
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=True,
+        methods=("GET",),
+        permission_classes=(AllowAny,),
+        pagination_class=None,
+    )
+    @cache_anonymous_response(constants.CACHE_RECIPES)
+    def similar(self, request, pk):
+        """Похожие по составу рецепты."""
+        recipes = Recipe.objects.filter(similar_to__recipe_id=pk).order_by(
+            "-similar_to__score"
+        )
+        if not recipes and not Recipe.objects.filter(pk=pk).exists():
+            return Response(
+                {"errors": "Страница не найдена"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        serializer = self.get_serializer(recipes, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=("GET",), permission_classes=(AllowAny,))
+    def pantry(self, request):
+        """
+        Рецепты из имеющихся ингредиентов (?ingredients=1&ingredients=2),
+        сначала те, для которых не хватает меньше ингредиентов.
+        Поддерживает фильтры списка рецептов (теги, автор и т.д.).
+        """
+        params = PantrySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        ingredients = params.validated_data["ingredients"]
+        recipe_ids = None
+        if set(request.query_params) & set(RecipeFilter.Meta.fields):
+            # Фильтры применяются в БД до ранжирования, к рецептам хотя бы
+            # с одним из ингредиентов – тем же, что найдёт индекс
+            recipe_ids = set(
+                self.filter_queryset(self.get_queryset())
+                .filter(
+                    id__in=IngredientRecipe.objects.filter(
+                        ingredient_id__in=ingredients
+                    ).values("recipe_id")
+                )
+                .order_by()
+                .values_list("id", flat=True)
+            )
+        ranked = get_index().search(
+            ingredients, params.validated_data.get("max_missing"), recipe_ids
+        )
+        page = self.paginate_queryset(ranked)
+        missing = dict(page)
+        recipes = fieldsets.recipe_queryset(
+            Recipe.objects.all(),
+            fieldsets.requested_fields(
+                request, RecipeListSerializer.Meta.fields
+            ),
+        ).in_bulk(missing)
+        data = self.get_serializer(
+            [recipes[pk] for pk in missing if pk in recipes], many=True
+        ).data
+        for recipe in data:
+            recipe["missing_ingredients"] = missing[recipe["id"]]
+        return self.get_paginated_response(data)
+
     @action(
         detail=False,
         methods=["GET"],
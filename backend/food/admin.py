@@ -1,7 +1,9 @@
 from django.contrib import admin
 
+from api import deletion
+
 from .models import (Favorite, Ingredient, IngredientRecipe, Recipe,
-                     ShoppingCart, ShortLink, Subscribe, Tag)
+                     ShoppingCart, ShortLink, Subscribe, Tag, Task)
 
 
 class IngredientsInline(admin.TabularInline):
@@ -70,6 +72,18 @@ class RecipeAdmin(admin.ModelAdmin):
     filter_horizontal = ("ingredients",)
     empty_value_display = "-пусто-"
     inlines = [IngredientsInline]
+    actions = ("bulk_delete",)
+
+    @admin.action(
+        description="Удалить выбранные рецепты пачками",
+        permissions=("delete",),
+    )
+    def bulk_delete(self, request, queryset):
+        ids = list(queryset.values_list("id", flat=True))
+        deletion.delete_recipes_by_id.delay(ids)
+        self.message_user(
+            request, f"Удаление рецептов поставлено в очередь: {len(ids)}"
+        )
 
     def in_favorite(self, obj):
         return obj.favorite.all().count()
@@ -99,6 +113,31 @@ class IngredientAdmin(admin.ModelAdmin):
 class ShortLinkAdmin(admin.ModelAdmin):
     """Админ-зона коротких ссылок."""
 
-    list_display = ("long_url", "short_url", "is_active", "created_at")
+    list_display = (
+        "long_url",
+        "short_url",
+        "is_active",
+        "created_at",
+        "clicks",
+        "last_clicked_at",
+    )
     list_filter = ("is_active",)
+    readonly_fields = ("clicks", "last_clicked_at")
     search_fields = ("long_url", "short_url", "is_active", "created_at")
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """Админ-зона фоновых задач."""
+
+    list_display = (
+        "id",
+        "name",
+        "status",
+        "attempts",
+        "run_at",
+        "finished_at",
+    )
+    list_filter = ("status", "name")
+    search_fields = ("name",)
+    readonly_fields = ("created_at", "started_at", "finished_at")
@@ -0,0 +1,208 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Max
+
+from food import partitioning
+from food.models import Recipe
+
+# Второй столбец пары (ключ секционирования, столбец) в каждой таблице
+OTHER_COLUMN = {
+    "food_favorite": "recipe_id",
+    "food_shoppingcart": "recipe_id",
+    "food_subscribe": "author_id",
+}
+# Запросы, которые приложение делает к таблицам; {key} – ключ
+# секционирования, {other} – второй столбец пары
+QUERIES = {
+    # interactions.load: все рецепты / подписки пользователя
+    "probe": "SELECT {other} FROM {table} WHERE {key} = %(user)s",
+    # Exists в bulk_template, фильтры is_favorited и is_subscribed
+    "exists": (
+        "SELECT 1 FROM {table} "
+        "WHERE {key} = %(user)s AND {other} = %(other)s"
+    ),
+}
+EXTRA_QUERIES = {
+    # services.shopping_cart: сумма ингредиентов по рецептам пользователя
+    "recipe_id": {
+        "aggregate": (
+            "SELECT ir.ingredient_id, sum(ir.amount) FROM {table} t "
+            "JOIN food_ingredientrecipe ir ON ir.recipe_id = t.recipe_id "
+            "WHERE t.{key} = %(user)s GROUP BY ir.ingredient_id"
+        ),
+    },
+    # Число подписчиков автора: поиск не по ключу, по всем секциям
+    "author_id": {
+        "followers": (
+            "SELECT count(*) FROM {table} WHERE author_id = %(other)s"
+        ),
+    },
+}
+# Строка номер g: пользователь g / per_user, второй столбец уникален
+# у пользователя; подписка на себя запрещена ограничением
+OTHER_VALUE = {
+    "recipe_id": "g %% {recipes} + 1",
+    "author_id": "g / {per_user} + 1 + g %% {per_user}",
+}
+
+
+def percentile(values, fraction):
+    return sorted(values)[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер запросов к таблицам избранного, покупок и подписок "
+        "в обычной и хеш-секционированной раскладке по мере роста числа "
+        "строк (--sizes). Таблицы – копии настоящих (LIKE: столбцы, "
+        "ограничения, индексы; без внешних ключей), секционированная "
+        "строится food.partitioning.rebuild, как в миграции. Данные "
+        "синтетические, у каждого пользователя --per-user строк; всё "
+        "откатывается. По умолчанию размеры малые; большие – явно, "
+        "например --sizes 1000000 10000000 100000000 200000000 "
+        "(на 1 млн строк обе раскладки таблицы занимают около 420 МБ "
+        "и заполняются около 20 с; 200 млн – порядка 85 ГБ и часа "
+        "на таблицу, --tables сужает прогон)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=(10_000, 100_000)
+        )
+        parser.add_argument(
+            "--tables",
+            nargs="+",
+            choices=tuple(partitioning.PARTITIONED_TABLES),
+            default=tuple(partitioning.PARTITIONED_TABLES),
+        )
+        parser.add_argument("--partitions", type=int, default=16)
+        parser.add_argument("--per-user", type=int, default=50)
+        parser.add_argument("--probes", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "postgresql":
+            raise CommandError("Секционирование есть только в PostgreSQL")
+        recipes = (
+            Recipe.objects.using(options["database"]).aggregate(
+                last=Max("id")
+            )["last"]
+            or 1000
+        )
+        per_user = min(options["per_user"], recipes)
+        rng = random.Random(options["seed"])
+        for table in options["tables"]:
+            with transaction.atomic(using=options["database"]):
+                with connection.cursor() as cursor:
+                    layouts = self.create_tables(
+                        cursor, table, options["partitions"]
+                    )
+                    rows = 0
+                    for size in sorted(options["sizes"]):
+                        self.fill(
+                            cursor, table, layouts, rows, size, per_user,
+                            recipes,
+                        )
+                        rows = size
+                        self.measure(
+                            cursor,
+                            table,
+                            layouts,
+                            size // per_user,
+                            recipes,
+                            options["probes"],
+                            rng,
+                        )
+                transaction.set_rollback(True, using=options["database"])
+
+    def create_tables(self, cursor, table, partitions):
+        """
+        Копии table: обычная и секционированная, как их раскладывает
+        миграция, в каком бы виде ни была сама table.
+        """
+        layouts = {
+            "plain": (f"bench_{table}", 0),
+            "partitioned": (f"bench_{table}_partitioned", partitions),
+        }
+        for name, count in layouts.values():
+            cursor.execute(
+                f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS "
+                "INCLUDING CONSTRAINTS INCLUDING INDEXES)"
+            )
+            partitioning.rebuild(
+                cursor,
+                name,
+                count,
+                key=partitioning.PARTITIONED_TABLES[table],
+            )
+        return {layout: name for layout, (name, _) in layouts.items()}
+
+    def fill(self, cursor, table, layouts, start, end, per_user, recipes):
+        """Строки с номерами start..end - 1, по per_user на пользователя."""
+        key = partitioning.PARTITIONED_TABLES[table]
+        other = OTHER_COLUMN[table]
+        cursor.execute(
+            "SELECT count(*) FROM information_schema.columns "
+            "WHERE table_name = %s AND column_name = 'created_at'",
+            [table],
+        )
+        (has_created_at,) = cursor.fetchone()
+        columns = ["id", key, other]
+        # id задаётся явно: последовательность настоящей таблицы
+        # при откате не вернулась бы назад
+        values = [
+            "g + 1",
+            f"g / {per_user}",
+            OTHER_VALUE[other].format(per_user=per_user, recipes=recipes),
+        ]
+        if has_created_at:
+            columns.append("created_at")
+            values.append("now() - g * interval '1 second'")
+        started = time.perf_counter()
+        for name in layouts.values():
+            cursor.execute(
+                f"INSERT INTO {name} ({', '.join(columns)}) "
+                f"SELECT {', '.join(values)} "
+                "FROM generate_series(%s, %s) AS g",
+                [start, end - 1],
+            )
+            cursor.execute(f"ANALYZE {name}")
+        self.stdout.write(
+            f"\n{table}: {end} строк, заполнение "
+            f"{time.perf_counter() - started:.1f} с"
+        )
+
+    def measure(self, cursor, table, layouts, users, recipes, probes, rng):
+        key = partitioning.PARTITIONED_TABLES[table]
+        other = OTHER_COLUMN[table]
+        queries = {**QUERIES, **EXTRA_QUERIES[other]}
+        for query_name, query in queries.items():
+            results = []
+            for layout, name in layouts.items():
+                timings = []
+                for _ in range(probes):
+                    params = {
+                        "user": rng.randrange(max(users, 1)),
+                        "other": (
+                            rng.randrange(recipes) + 1
+                            if other == "recipe_id"
+                            else rng.randrange(max(users, 1)) + 1
+                        ),
+                    }
+                    started = time.perf_counter()
+                    cursor.execute(
+                        query.format(table=name, key=key, other=other),
+                        params,
+                    )
+                    cursor.fetchall()
+                    timings.append(time.perf_counter() - started)
+                results.append(
+                    f"{layout} p50 {percentile(timings, 0.5) * 1000:.3f} / "
+                    f"p99 {percentile(timings, 0.99) * 1000:.3f} мс"
+                )
+            self.stdout.write(f"  {query_name:>9}: " + "; ".join(results))
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import constants, deletion
+from food.models import Recipe
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаление пользователей (--users) или рецептов (--recipes, "
+        "--author) со всеми связанными строками прямыми DELETE пачками. "
+        "Каждая пачка – отдельная транзакция, сигналы не отправляются, "
+        "кеши сбрасываются один раз на пачку."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, nargs="+", default=())
+        parser.add_argument("--recipes", type=int, nargs="+", default=())
+        parser.add_argument(
+            "--author",
+            type=int,
+            nargs="+",
+            default=(),
+            help="Удалить все рецепты этих авторов, не удаляя авторов",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=constants.BULK_DELETE_BATCH_SIZE,
+        )
+
+    def progress(self, label):
+        def report(total):
+            self.stdout.write(f"{label}: {total}")
+
+        return report
+
+    def handle(self, *args, **options):
+        if not (options["users"] or options["recipes"] or options["author"]):
+            raise CommandError("Укажите --users, --recipes или --author")
+        if options["recipes"] or options["author"]:
+            recipes = Recipe.objects.none()
+            if options["recipes"]:
+                recipes |= Recipe.objects.filter(id__in=options["recipes"])
+            if options["author"]:
+                recipes |= Recipe.objects.filter(
+                    author_id__in=options["author"]
+                )
+            total = deletion.delete_recipes(
+                recipes,
+                options["batch_size"],
+                self.progress("Удалено рецептов"),
+            )
+            self.stdout.write(self.style.SUCCESS(f"Удалено рецептов: {total}"))
+        if options["users"]:
+            total = deletion.delete_users(
+                User.objects.filter(id__in=options["users"]),
+                options["batch_size"],
+                self.progress("Удалено пользователей"),
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"Удалено пользователей: {total}")
+            )
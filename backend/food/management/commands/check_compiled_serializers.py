@@ -0,0 +1,120 @@
+from timeit import timeit
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from api import compiled
+from api.serializers import (IngredientSerializer, RecipeListSerializer,
+                             RecipeMiniSerializer,
+                             SubscribeListCreateDeleteSerializer)
+from food.models import Ingredient, Recipe, Subscribe
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнение быстрых сериализаторов списков (api.compiled) "
+        "с обычными ModelSerializer и замер скорости."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", type=int, help="id пользователя для контекста запроса"
+        )
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument("--limit", type=int, default=100)
+        parser.add_argument("--recipes-limit", default="3")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get(
+            "/api/",
+            {"recipes_limit": options["recipes_limit"]},
+            HTTP_HOST=options["host"],
+        )
+        request.user = (
+            User.objects.get(id=options["user"])
+            if options["user"]
+            else AnonymousUser()
+        )
+        context = {"request": request}
+        limit = options["limit"]
+        subscribes = Subscribe.objects.all()
+        if options["user"]:
+            subscribes = subscribes.filter(user=request.user)
+        recipe_child = RecipeListSerializer(context=context)
+        checks = (
+            (
+                "ingredients",
+                IngredientSerializer,
+                Ingredient.objects.all()[:limit],
+            ),
+            (
+                "recipes_mini",
+                RecipeMiniSerializer,
+                Recipe.objects.all()[:limit],
+            ),
+            (
+                "subscriptions",
+                SubscribeListCreateDeleteSerializer,
+                subscribes[:limit],
+            ),
+        )
+        cases = [
+            (
+                name,
+                lambda queryset=queryset, child=serializer(context=context): [
+                    child.to_representation(obj) for obj in queryset.all()
+                ],
+                lambda queryset=queryset, serializer=serializer: serializer(
+                    queryset.all(), many=True, context=context
+                ).data,
+            )
+            for name, serializer, queryset in checks
+        ]
+        recipes = Recipe.objects.all()[:limit]
+
+        def recipe_fragments():
+            ids = list(recipes.values_list("id", flat=True))
+            fragments = compiled.recipe_fragments(ids, request)
+            return [recipe_child.with_user_flags(fragments[pk]) for pk in ids]
+
+        cases.append(
+            (
+                "recipe_fragments",
+                lambda: [
+                    recipe_child.with_user_flags(
+                        recipe_child.to_fragment(recipe)
+                    )
+                    for recipe in recipes.prefetch_related(
+                        "author", "tags", "recipe_ingredients__ingredient"
+                    )
+                ],
+                recipe_fragments,
+            )
+        )
+
+        renderer = JSONRenderer()
+        mismatched = []
+        for name, reference, fast in cases:
+            expected = renderer.render(reference())
+            if renderer.render(fast()) != expected:
+                mismatched.append(name)
+                continue
+            reference_time = timeit(reference, number=options["repeat"])
+            fast_time = timeit(fast, number=options["repeat"])
+            self.stdout.write(
+                "{}: {:.2f} мс -> {:.2f} мс, x{:.1f}".format(
+                    name,
+                    reference_time * 1000 / options["repeat"],
+                    fast_time * 1000 / options["repeat"],
+                    reference_time / fast_time,
+                )
+            )
+        if mismatched:
+            raise CommandError(
+                "Ответы отличаются: {}".format(", ".join(mismatched))
+            )
+        self.stdout.write(self.style.SUCCESS("Ответы совпадают"))
@@ -0,0 +1,80 @@
+import csv
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.ingredient_search import TrigramIndex, get_index, normalize
+
+
+def typo(name, rng):
+    """Название с одной опечаткой: пропуск, замена или перестановка букв."""
+    chars = list(name)
+    position = rng.randrange(len(chars))
+    kind = rng.choice(("drop", "replace", "swap"))
+    if kind == "drop" and len(chars) > 3:
+        del chars[position]
+    elif kind == "swap" and position + 1 < len(chars):
+        chars[position], chars[position + 1] = (
+            chars[position + 1],
+            chars[position],
+        )
+    else:
+        chars[position] = rng.choice("аеиоуя")
+    return "".join(chars)
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер поиска ингредиентов с опечатками: по каждому названию "
+        "справочника – запрос с одной опечаткой. Печатает p50/p99 "
+        "времени поиска и долю запросов, где исходное название "
+        "попало в первые --top результатов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--csv",
+            help="Файл справочника (data/ingredients.csv) вместо БД",
+        )
+        parser.add_argument("--top", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--max-p99",
+            type=float,
+            help="Ошибка, если p99 в миллисекундах больше",
+        )
+
+    def handle(self, *args, **options):
+        if options["csv"]:
+            with open(options["csv"], encoding="utf-8") as file:
+                rows = [
+                    (number, row[0])
+                    for number, row in enumerate(csv.reader(file), 1)
+                ]
+            index = TrigramIndex(version=None, rows=rows)
+        else:
+            index = get_index()
+            rows = list(zip(index.ids, index.names))
+        if not rows:
+            raise CommandError("Справочник ингредиентов пуст")
+        rng = random.Random(options["seed"])
+        timings = []
+        found = 0
+        for ingredient_id, name in rows:
+            query = typo(normalize(name), rng)
+            started = time.perf_counter()
+            result = index.search(query)
+            timings.append(time.perf_counter() - started)
+            found += ingredient_id in result[: options["top"]]
+        timings.sort()
+        p50 = timings[len(timings) // 2] * 1000
+        p99 = timings[int(len(timings) * 0.99)] * 1000
+        self.stdout.write(
+            f"Запросов: {len(rows)}, p50 {p50:.3f} мс, p99 {p99:.3f} мс, "
+            f"найдено в первых {options['top']}: {found / len(rows):.1%}"
+        )
+        if options["max_p99"] is not None and p99 > options["max_p99"]:
+            raise CommandError(
+                f"p99 {p99:.3f} мс больше {options['max_p99']} мс"
+            )
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from food import query_plans
+
+
+class Command(BaseCommand):
+    help = (
+        "Проверка планов запросов основных эндпоинтов через "
+        "EXPLAIN (FORMAT JSON) на данных базы с обычными настройками "
+        "планировщика: ошибка, если какой-то запрос читает большую "
+        "таблицу полным просмотром. Только для PostgreSQL; "
+        "все изменения (--seed) откатываются. Та же проверка на "
+        "синтетических данных – тест food.tests.test_query_plans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Добавить столько рецептов (и связанных данных) перед "
+            "проверкой, чтобы планировщик видел реальные объёмы",
+        )
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "postgresql":
+            raise CommandError(
+                "EXPLAIN (FORMAT JSON) есть только в PostgreSQL"
+            )
+        with transaction.atomic(using=options["database"]):
+            if options["seed"]:
+                query_plans.seed(options["seed"])
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+                plans = query_plans.check(cursor, options["database"])
+            transaction.set_rollback(True, using=options["database"])
+        failures = []
+        for name, tables in plans.items():
+            if tables:
+                failures.append(f"{name}: {', '.join(tables)}")
+                self.stdout.write(
+                    self.style.ERROR(f"{name}: Seq Scan {', '.join(tables)}")
+                )
+            else:
+                self.stdout.write(f"{name}: ok")
+        if failures:
+            raise CommandError(
+                "Полный просмотр больших таблиц: " + "; ".join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS("Планы запросов в порядке"))
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import (Case, Count, FloatField, IntegerField, OuterRef,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from api import constants
+from api.cache import bump_version
+from food.models import Favorite, Recipe, RecipeRanking, ShoppingCart
+
+
+def decay_weight(now):
+    """Вес добавления рецепта, убывающий вдвое каждые HALF_LIFE дней."""
+    return Case(
+        *(
+            When(
+                created_at__gte=now - timedelta(days=day + 1),
+                then=Value(0.5 ** (day / constants.RANKING_HALF_LIFE_DAYS)),
+            )
+            for day in range(constants.RANKING_WINDOW_DAYS)
+        ),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def score(queryset, aggregate, output_field):
+    """Подзапрос с агрегатом строк queryset по текущему рецепту."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(recipe_id=OuterRef("pk"))
+            .order_by()
+            .values("recipe_id")
+            .annotate(score=aggregate)
+            .values("score"),
+            output_field=output_field,
+        ),
+        Value(0),
+        output_field=output_field,
+    )
+
+
+def scores(now):
+    """Очки каждого рецепта: (id, popular_score, trending_score)."""
+    window_start = now - timedelta(days=constants.RANKING_WINDOW_DAYS)
+    trending = [
+        score(
+            model.objects.filter(created_at__gte=window_start),
+            Sum(decay_weight(now)),
+            FloatField(),
+        )
+        for model in (Favorite, ShoppingCart)
+    ]
+    return (
+        Recipe.objects.order_by()
+        .annotate(
+            popular_score=score(
+                Favorite.objects, Count("id"), IntegerField()
+            ),
+            trending_score=trending[0] + trending[1],
+        )
+        .values_list("id", "popular_score", "trending_score")
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчёт рейтингов рецептов popular (всего в избранном) "
+        "и trending (избранное и покупки за последние дни с затуханием) "
+        "одним запросом INSERT ... SELECT в БД."
+    )
+
+    def handle(self, *args, **options):
+        select, params = scores(timezone.now()).query.sql_with_params()
+        table = RecipeRanking._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Места уникальны, поэтому строки заменяются целиком:
+            # UPDATE на месте нарушал бы уникальность при перестановках
+            RecipeRanking.objects.all()._raw_delete(connection.alias)
+            # ROW_NUMBER(), а не RANK(): места уникальны,
+            # при равных очках новые рецепты выше
+            cursor.execute(
+                f"INSERT INTO {table} (recipe_id, popular_score, "
+                "trending_score, popular_rank, trending_rank) "
+                "SELECT id, popular_score, trending_score, "
+                "ROW_NUMBER() OVER (ORDER BY popular_score DESC, id DESC), "
+                "ROW_NUMBER() OVER (ORDER BY trending_score DESC, id DESC) "
+                f"FROM ({select}) AS scores",
+                params,
+            )
+            count = cursor.rowcount
+        bump_version(constants.CACHE_RECIPES)
+        self.stdout.write(
+            self.style.SUCCESS(f"Рейтинги пересчитаны для {count} рецептов")
+        )
@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api import constants
+from api.cache import bump_version
+from api.similarity import RecipeMatrix, affected_rows, save_neighbours
+from food.models import Recipe
+
+COMPUTED_AT_KEY = "similarity:computed-at"
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчёт похожих по составу рецептов. По умолчанию пересчитываются "
+        "только рецепты, изменённые после прошлого запуска, и рецепты, "
+        "чьи списки соседей от них зависят."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Пересчитать соседей для всех рецептов",
+        )
+        parser.add_argument(
+            "--metric",
+            choices=(
+                constants.SIMILARITY_JACCARD,
+                constants.SIMILARITY_COSINE,
+            ),
+            default=constants.SIMILARITY_JACCARD,
+        )
+        parser.add_argument(
+            "-k", type=int, default=constants.SIMILAR_RECIPES_COUNT
+        )
+
+    def handle(self, *args, **options):
+        started_at = timezone.now()
+        computed_at = cache.get(COMPUTED_AT_KEY)
+        matrix = RecipeMatrix()
+        if options["full"] or computed_at is None:
+            rows = matrix.rows(matrix.recipe_ids)
+        else:
+            changed = list(
+                Recipe.objects.filter(
+                    updated_at__gte=computed_at
+                ).values_list("id", flat=True)
+            )
+            rows = affected_rows(
+                matrix, changed, options["metric"], options["k"]
+            )
+        save_neighbours(matrix, rows, options["metric"], options["k"])
+        cache.set(COMPUTED_AT_KEY, started_at, None)
+        bump_version(constants.CACHE_RECIPES)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Похожие рецепты пересчитаны для {len(rows)} рецептов"
+            )
+        )
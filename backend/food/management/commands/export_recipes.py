@@ -0,0 +1,95 @@
+import json
+import sys
+from collections import defaultdict
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from api import constants
+from food.models import IngredientRecipe, Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоковая выгрузка рецептов в NDJSON: одна строка – рецепт "
+        "с автором (email), тегами, ингредиентами и путём картинки. "
+        "Память не зависит от числа рецептов. Загрузка – import_recipes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", default="-", help="Файл выгрузки, по умолчанию stdout"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=constants.RECIPE_EXPORT_BATCH_SIZE,
+        )
+
+    def related(self, recipe_ids):
+        """Теги и ингредиенты пачки рецептов: два запроса на пачку."""
+        tags = defaultdict(list)
+        for recipe_id, slug, name in (
+            Recipe.tags.through.objects.filter(recipe_id__in=recipe_ids)
+            .order_by("tag_id")
+            .values_list("recipe_id", "tag__slug", "tag__name")
+        ):
+            tags[recipe_id].append({"slug": slug, "name": name})
+        ingredients = defaultdict(list)
+        for recipe_id, name, measurement_unit, amount in (
+            IngredientRecipe.objects.filter(recipe_id__in=recipe_ids)
+            .order_by("id")
+            .values_list(
+                "recipe_id",
+                "ingredient__name",
+                "ingredient__measurement_unit",
+                "amount",
+            )
+        ):
+            ingredients[recipe_id].append(
+                {
+                    "name": name,
+                    "measurement_unit": measurement_unit,
+                    "amount": amount,
+                }
+            )
+        return tags, ingredients
+
+    def handle(self, *args, **options):
+        output = (
+            sys.stdout
+            if options["output"] == "-"
+            else open(options["output"], "w", encoding="utf-8")
+        )
+        recipes = (
+            Recipe.objects.order_by("id")
+            .values(
+                "id",
+                "name",
+                "text",
+                "cooking_time",
+                "image",
+                "author__email",
+            )
+            .iterator(chunk_size=options["batch_size"])
+        )
+        count = 0
+        try:
+            while True:
+                batch = list(islice(recipes, options["batch_size"]))
+                if not batch:
+                    break
+                tags, ingredients = self.related(
+                    [recipe["id"] for recipe in batch]
+                )
+                for recipe in batch:
+                    recipe["author"] = recipe.pop("author__email")
+                    recipe["tags"] = tags[recipe["id"]]
+                    recipe["ingredients"] = ingredients[recipe["id"]]
+                    output.write(json.dumps(recipe, ensure_ascii=False))
+                    output.write("\n")
+                count += len(batch)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        self.stderr.write(self.style.SUCCESS(f"Выгружено рецептов: {count}"))
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api import constants, media
+from food.models import MediaFile
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаление файлов хранилища, на которые не ссылается ни одна модель "
+        "(MediaFile.refs <= 0 дольше MEDIA_GC_GRACE_SECONDS). "
+        "Перед удалением ссылки каждой пачки проверяются по моделям."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=constants.MEDIA_GC_BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--grace",
+            type=int,
+            default=settings.MEDIA_GC_GRACE_SECONDS,
+            help="Не удалять файлы моложе стольких секунд",
+        )
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Сначала пересчитать счётчики ссылок по моделям",
+        )
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            media.recount()
+        cutoff = timezone.now() - timedelta(seconds=options["grace"])
+        removed = 0
+        while True:
+            with transaction.atomic():
+                orphans = list(
+                    MediaFile.objects.select_for_update(skip_locked=True)
+                    .filter(refs__lte=0, updated_at__lt=cutoff)
+                    .order_by("id")[: options["batch_size"]]
+                )
+                if not orphans:
+                    break
+                # Счётчики могли разойтись (bulk_create, update):
+                # файлы со ссылками не удаляем, а чиним их счётчик
+                references = media.references([obj.name for obj in orphans])
+                for obj in orphans:
+                    if references[obj.name]:
+                        MediaFile.objects.filter(id=obj.id).update(
+                            refs=references[obj.name]
+                        )
+                    else:
+                        default_storage.delete(obj.name)
+                unused = [
+                    obj.id for obj in orphans if not references[obj.name]
+                ]
+                MediaFile.objects.filter(id__in=unused).delete()
+                removed += len(unused)
+        self.stdout.write(self.style.SUCCESS(f"Удалено файлов: {removed}"))
@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from foodgram.schema import CODECS, build_schema, code_version, schema_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Сборка OpenAPI-схемы для текущей версии кода в SCHEMA_ROOT "
+        "(запускается при сборке образа). Схемы прошлых версий удаляются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            dest="codecs",
+            action="append",
+            choices=tuple(CODECS),
+            help="Формат схемы, по умолчанию все",
+        )
+
+    def handle(self, *args, **options):
+        codecs = options["codecs"] or tuple(CODECS)
+        build_schema(codecs)
+        current = {schema_path(codec) for codec in codecs}
+        for path in Path(settings.SCHEMA_ROOT).glob("openapi-*"):
+            if path not in current:
+                path.unlink()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Схема версии {code_version()} сохранена в "
+                f"{settings.SCHEMA_ROOT}"
+            )
+        )
@@ -0,0 +1,214 @@
+import json
+import os
+import sys
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api import constants
+from api.cache import bump_version
+from food.models import Ingredient, IngredientRecipe, Recipe, Tag
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Загрузка рецептов из NDJSON, выгруженного export_recipes, "
+        "пачками через bulk_create. После каждой пачки номер строки "
+        "сохраняется в файл контрольной точки, повторный запуск "
+        "продолжает с него. Рецепты, уже существующие у автора "
+        "(то же название), и рецепты неизвестных авторов пропускаются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл NDJSON или - для stdin")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=constants.RECIPE_EXPORT_BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Файл контрольной точки, по умолчанию <path>.checkpoint",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Начать с первой строки, игнорируя контрольную точку",
+        )
+
+    @staticmethod
+    def read_checkpoint(path):
+        try:
+            with open(path, encoding="utf-8") as file:
+                return int(file.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def write_checkpoint(path, line):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(str(line))
+        os.replace(tmp_path, path)
+
+    def resolve_tags(self, records):
+        """id тегов по slug, недостающие теги создаются."""
+        missing = {
+            tag["slug"]: tag["name"]
+            for record in records
+            for tag in record["tags"]
+            if tag["slug"] not in self.tags
+        }
+        if missing:
+            Tag.objects.bulk_create(
+                Tag(slug=slug, name=name) for slug, name in missing.items()
+            )
+            self.tags.update(
+                Tag.objects.filter(slug__in=missing).values_list("slug", "id")
+            )
+
+    def resolve_ingredients(self, records):
+        """id ингредиентов по (название, единица), недостающие создаются."""
+        missing = {
+            (ingredient["name"], ingredient["measurement_unit"])
+            for record in records
+            for ingredient in record["ingredients"]
+        } - self.ingredients.keys()
+        if missing:
+            Ingredient.objects.bulk_create(
+                Ingredient(name=name, measurement_unit=measurement_unit)
+                for name, measurement_unit in missing
+            )
+            for pk, name, measurement_unit in Ingredient.objects.filter(
+                name__in={name for name, _ in missing}
+            ).values_list("id", "name", "measurement_unit"):
+                self.ingredients[(name, measurement_unit)] = pk
+
+    @transaction.atomic
+    def import_batch(self, records):
+        """Пачка рецептов: пять-семь запросов независимо от её размера."""
+        authors = dict(
+            User.objects.filter(
+                email__in={record["author"] for record in records}
+            ).values_list("email", "id")
+        )
+        records = [record for record in records if record["author"] in authors]
+        for record in records:
+            record["author_id"] = authors[record["author"]]
+        existing = set(
+            Recipe.objects.filter(
+                author_id__in={record["author_id"] for record in records},
+                name__in={record["name"] for record in records},
+            ).values_list("author_id", "name")
+        )
+        records = list(
+            {
+                (record["author_id"], record["name"]): record
+                for record in records
+                if (record["author_id"], record["name"]) not in existing
+            }.values()
+        )
+        if not records:
+            return 0
+        self.resolve_tags(records)
+        self.resolve_ingredients(records)
+        Recipe.objects.bulk_create(
+            Recipe(
+                author_id=record["author_id"],
+                name=record["name"],
+                text=record["text"],
+                cooking_time=record["cooking_time"],
+                image=record["image"],
+            )
+            for record in records
+        )
+        # bulk_create возвращает id не во всех СУБД, поэтому перечитываем
+        recipe_ids = {
+            (author_id, name): pk
+            for pk, author_id, name in Recipe.objects.filter(
+                author_id__in={record["author_id"] for record in records},
+                name__in={record["name"] for record in records},
+            ).values_list("id", "author_id", "name")
+        }
+        links = []
+        tag_links = []
+        for record in records:
+            recipe_id = recipe_ids[(record["author_id"], record["name"])]
+            for ingredient in record["ingredients"]:
+                links.append(
+                    IngredientRecipe(
+                        recipe_id=recipe_id,
+                        ingredient_id=self.ingredients[
+                            (
+                                ingredient["name"],
+                                ingredient["measurement_unit"],
+                            )
+                        ],
+                        amount=ingredient["amount"],
+                    )
+                )
+            for tag in record["tags"]:
+                tag_links.append(
+                    Recipe.tags.through(
+                        recipe_id=recipe_id, tag_id=self.tags[tag["slug"]]
+                    )
+                )
+        IngredientRecipe.objects.bulk_create(links, ignore_conflicts=True)
+        Recipe.tags.through.objects.bulk_create(
+            tag_links, ignore_conflicts=True
+        )
+        return len(records)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        checkpoint = options["checkpoint"] or (
+            None if path == "-" else f"{path}.checkpoint"
+        )
+        start = (
+            0
+            if options["restart"] or checkpoint is None
+            else self.read_checkpoint(checkpoint)
+        )
+        self.ingredients = {
+            (name, measurement_unit): pk
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                "id", "name", "measurement_unit"
+            ).iterator()
+        }
+        self.tags = dict(Tag.objects.values_list("slug", "id"))
+        source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        line, imported = start, 0
+        try:
+            lines = islice(source, start, None)
+            while True:
+                chunk = list(islice(lines, options["batch_size"]))
+                if not chunk:
+                    break
+                try:
+                    records = [json.loads(row) for row in chunk if row.strip()]
+                except ValueError as error:
+                    raise CommandError(
+                        f"Ошибка в строках {line + 1}-{line + len(chunk)}: "
+                        f"{error}"
+                    )
+                imported += self.import_batch(records)
+                line += len(chunk)
+                if checkpoint:
+                    self.write_checkpoint(checkpoint, line)
+                self.stderr.write(f"Строк: {line}, загружено: {imported}")
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        # bulk_create не вызывает сигналы: сбрасываем кеши явно
+        for namespace in (
+            constants.CACHE_RECIPES,
+            constants.CACHE_PANTRY,
+            constants.CACHE_TAGS,
+            constants.CACHE_INGREDIENTS,
+        ):
+            bump_version(namespace)
+        self.stdout.write(
+            self.style.SUCCESS(f"Загружено рецептов: {imported}")
+        )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from food import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересоздание таблиц избранного, покупок и подписок с --partitions "
+        "хеш-секциями (0 – обычная таблица) с переносом данных. Каждая "
+        "таблица – отдельная транзакция, на время переноса она "
+        "заблокирована. Без --partitions печатает текущее состояние."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--partitions", type=int)
+        parser.add_argument(
+            "--table",
+            action="append",
+            choices=tuple(partitioning.PARTITIONED_TABLES),
+            help="Таблица, по умолчанию все",
+        )
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "postgresql":
+            raise CommandError("Секционирование есть только в PostgreSQL")
+        if options["partitions"] is not None and options["partitions"] < 0:
+            raise CommandError("--partitions не может быть отрицательным")
+        for table in options["table"] or partitioning.PARTITIONED_TABLES:
+            with transaction.atomic(using=options["database"]):
+                with connection.cursor() as cursor:
+                    if options["partitions"] is not None:
+                        partitioning.rebuild(
+                            cursor, table, options["partitions"]
+                        )
+                    count = partitioning.partition_count(cursor, table)
+            key = partitioning.PARTITIONED_TABLES[table]
+            self.stdout.write(
+                f"{table}: секций {count}, ключ {key}"
+                if count
+                else f"{table}: без секций"
+            )
@@ -0,0 +1,78 @@
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Строка вывода python -X importtime: self | cumulative | имя модуля
+IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Профиль холодного запуска в новом процессе: время этапов "
+        "(django.setup, wsgi, preload, warm-up) и самые медленные "
+        "импорты по данным python -X importtime."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=25, help="Сколько модулей вывести"
+        )
+        parser.add_argument(
+            "--packages",
+            action="store_true",
+            help="Суммировать время по пакетам верхнего уровня",
+        )
+        parser.add_argument(
+            "--warm-up",
+            action="store_true",
+            help="Включить прогрев воркера (нужна БД)",
+        )
+
+    def handle(self, *args, **options):
+        command = [
+            sys.executable, "-X", "importtime", "-m", "foodgram.warmup"
+        ]
+        if options["warm_up"]:
+            command.append("--warm-up")
+        result = subprocess.run(
+            command,
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr[-2000:])
+        timings = json.loads(result.stdout)
+        for stage, seconds in timings.items():
+            self.stdout.write(f"{stage:>10}: {seconds * 1000:8.1f} мс")
+
+        modules = []
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME.match(line)
+            if match:
+                own, cumulative, indent, name = match.groups()
+                modules.append((name, int(own), int(cumulative), indent))
+        if options["packages"]:
+            totals = defaultdict(int)
+            for name, own, _, _ in modules:
+                totals[name.partition(".")[0]] += own
+            rows = sorted(totals.items(), key=lambda row: -row[1])
+            self.stdout.write("\nПакет: собственное время импорта, мс")
+        else:
+            # Корни цепочек импорта: их время включает все зависимости
+            rows = sorted(
+                (
+                    (name, cumulative)
+                    for name, _, cumulative, indent in modules
+                    if not indent
+                ),
+                key=lambda row: -row[1],
+            )
+            self.stdout.write("\nМодуль: время импорта с зависимостями, мс")
+        for name, microseconds in rows[: options["limit"]]:
+            self.stdout.write(f"{microseconds / 1000:8.1f}  {name}")
@@ -0,0 +1,92 @@
+import multiprocessing
+import signal
+
+from django import db
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api import constants, tasks
+
+
+def work(batch_size, poll_interval, stopping):
+    """Цикл процесса-воркера: забрать пачку задач и выполнить их."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while not stopping.is_set():
+        claimed = tasks.claim(batch_size)
+        for obj in claimed:
+            tasks.execute(obj)
+        if not claimed:
+            stopping.wait(poll_interval)
+    db.connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполнение фоновых задач из таблицы Task пулом процессов. "
+        "Раз в --stats-interval секунд печатает пропускную способность "
+        "и задержку очереди, возвращает в очередь зависшие задачи "
+        "и удаляет старые выполненные."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=multiprocessing.cpu_count()
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=constants.TASK_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.TASK_POLL_INTERVAL,
+            help="Пауза в секундах, если очередь пуста",
+        )
+        parser.add_argument("--stats-interval", type=float, default=60)
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=settings.TASK_KEEP_DAYS,
+            help="Сколько дней хранить выполненные задачи",
+        )
+
+    def handle(self, *args, **options):
+        # Соединения с БД не должны переходить в дочерние процессы
+        db.connections.close_all()
+        stopping = multiprocessing.Event()
+        signal.signal(signal.SIGTERM, lambda *args: stopping.set())
+        workers = [
+            multiprocessing.Process(
+                target=work,
+                args=(
+                    options["batch_size"],
+                    options["poll_interval"],
+                    stopping,
+                ),
+                daemon=True,
+            )
+            for _ in range(options["processes"])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"Запущено воркеров: {len(workers)}")
+        try:
+            since = timezone.now()
+            while not stopping.wait(options["stats_interval"]):
+                now = timezone.now()
+                self.report(tasks.stats(since), (now - since).total_seconds())
+                since = now
+                tasks.requeue_stale()
+                tasks.purge(options["keep_days"])
+        except KeyboardInterrupt:
+            stopping.set()
+        for worker in workers:
+            worker.join()
+
+    def report(self, stats, seconds):
+        self.stdout.write(
+            "Выполнено: {done}, ошибок: {failed}, {rate:.1f} задач/с; "
+            "в очереди: {pending}, задержка {lag:.1f} с".format(
+                rate=(stats["done"] + stats["failed"]) / seconds, **stats
+            )
+        )
@@ -0,0 +1,77 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from api import constants
+from food.models import ShortLink
+
+
+class Command(BaseCommand):
+    help = (
+        "Отключение коротких ссылок без переходов за --days дней "
+        "(с --purge – удаление уже отключённых). Ссылки обрабатываются "
+        "пачками по id, каждая пачка – отдельная короткая транзакция."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.SHORT_LINK_EXPIRY_DAYS
+        )
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Удалить отключённые ссылки с истёкшим сроком",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=constants.SHORT_LINK_SWEEP_BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Пауза между пачками в секундах",
+        )
+
+    def handle(self, *args, **options):
+        expired_before = timezone.now() - timedelta(days=options["days"])
+        expired = ShortLink.objects.filter(
+            Q(last_clicked_at__lt=expired_before)
+            | Q(last_clicked_at__isnull=True),
+            created_at__lt=expired_before,
+            is_active=not options["purge"],
+        )
+        total = 0
+        while True:
+            ids = list(
+                expired.order_by("id").values_list("id", flat=True)[
+                    : options["batch_size"]
+                ]
+            )
+            if not ids:
+                break
+            batch = expired.filter(id__in=ids)
+            if options["purge"]:
+                batch.delete()
+            else:
+                batch.update(is_active=False)
+            total += len(ids)
+            if options["pause"]:
+                time.sleep(options["pause"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "{}: {}".format(
+                    (
+                        "Удалено ссылок"
+                        if options["purge"]
+                        else "Отключено ссылок"
+                    ),
+                    total,
+                )
+            )
+        )
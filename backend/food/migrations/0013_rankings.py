@@ -0,0 +1,88 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:50
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.timezone import utc
+
+# Дата для уже существующих строк: старше окна trending, чтобы прошлые
+# добавления не считались недавними в первые дни после миграции
+HISTORICAL_DATE = datetime.datetime(1970, 1, 1, tzinfo=utc)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("food", "0012_feedentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecipeRanking",
+            fields=[
+                (
+                    "recipe",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="ranking",
+                        serialize=False,
+                        to="food.recipe",
+                        verbose_name="Рецепт",
+                    ),
+                ),
+                (
+                    "popular_score",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Добавлений в избранное"
+                    ),
+                ),
+                (
+                    "trending_score",
+                    models.FloatField(
+                        default=0, verbose_name="Популярность за последние дни"
+                    ),
+                ),
+                (
+                    "popular_rank",
+                    models.PositiveIntegerField(
+                        unique=True, verbose_name="Место в популярных"
+                    ),
+                ),
+                (
+                    "trending_rank",
+                    models.PositiveIntegerField(
+                        unique=True,
+                        verbose_name="Место в набирающих популярность",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Рейтинг рецепта",
+                "verbose_name_plural": "Рейтинги рецептов",
+            },
+        ),
+        migrations.AddField(
+            model_name="favorite",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True,
+                db_index=True,
+                default=HISTORICAL_DATE,
+                verbose_name="Дата добавления",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="shoppingcart",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True,
+                db_index=True,
+                default=HISTORICAL_DATE,
+                verbose_name="Дата добавления",
+            ),
+            preserve_default=False,
+        ),
+    ]
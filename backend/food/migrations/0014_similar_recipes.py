@@ -0,0 +1,70 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("food", "0013_rankings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, verbose_name="Дата изменения"
+            ),
+        ),
+        migrations.CreateModel(
+            name="SimilarRecipe",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField(verbose_name="Схожесть")),
+                (
+                    "recipe",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similar_recipes",
+                        to="food.recipe",
+                        verbose_name="Рецепт",
+                    ),
+                ),
+                (
+                    "similar",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similar_to",
+                        to="food.recipe",
+                        verbose_name="Похожий рецепт",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Похожий рецепт",
+                "verbose_name_plural": "Похожие рецепты",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="similarrecipe",
+            index=models.Index(
+                fields=["recipe", "-score"], name="similar_recipe_score_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="similarrecipe",
+            constraint=models.UniqueConstraint(
+                fields=("recipe", "similar"), name="unique_similar_recipe"
+            ),
+        ),
+    ]
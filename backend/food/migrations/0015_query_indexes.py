@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("food", "0014_similar_recipes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["author", "-id"], name="recipe_author_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shortlink",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["short_url"],
+                name="shortlink_active_idx",
+            ),
+        ),
+        # Фильтр по тегам идёт от тега к рецептам: составной индекс
+        # позволяет читать связи только из индекса
+        migrations.RunSQL(
+            "CREATE INDEX recipe_tags_tag_recipe_idx "
+            "ON food_recipe_tags (tag_id, recipe_id)",
+            "DROP INDEX recipe_tags_tag_recipe_idx",
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("food", "0015_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shortlink",
+            name="clicks",
+            field=models.PositiveBigIntegerField(
+                default=0, verbose_name="Переходов"
+            ),
+        ),
+        migrations.AddField(
+            model_name="shortlink",
+            name="last_clicked_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Последний переход"
+            ),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:07
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def count_references(apps, schema_editor):
+    """Счётчики для файлов, загруженных до хранилища по содержимому."""
+    MediaFile = apps.get_model("food", "MediaFile")
+    refs = Counter()
+    for model, field in (("food.Recipe", "image"), ("users.User", "avatar")):
+        for name in (
+            apps.get_model(model)
+            .objects.exclude(**{f"{field}__isnull": True})
+            .exclude(**{field: ""})
+            .values_list(field, flat=True)
+            .iterator()
+        ):
+            refs[name] += 1
+    MediaFile.objects.bulk_create(
+        (MediaFile(name=name, refs=count) for name, count in refs.items()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("food", "0016_shortlink_clicks"),
+        ("users", "0008_remove_user_role"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=255,
+                        unique=True,
+                        verbose_name="Путь в хранилище",
+                    ),
+                ),
+                (
+                    "refs",
+                    models.IntegerField(default=0, verbose_name="Ссылок"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Дата изменения"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Медиафайл",
+                "verbose_name_plural": "Медиафайлы",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="mediafile",
+            index=models.Index(
+                condition=models.Q(("refs__lte", 0)),
+                fields=["updated_at"],
+                name="mediafile_orphan_idx",
+            ),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
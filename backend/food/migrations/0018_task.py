@@ -0,0 +1,117 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("food", "0017_media_files"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Task",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=255, verbose_name="Функция"),
+                ),
+                (
+                    "args",
+                    models.JSONField(default=list, verbose_name="Аргументы"),
+                ),
+                (
+                    "kwargs",
+                    models.JSONField(
+                        default=dict, verbose_name="Именованные аргументы"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "В очереди"),
+                            ("running", "Выполняется"),
+                            ("done", "Выполнена"),
+                            ("failed", "Ошибка"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                        verbose_name="Состояние",
+                    ),
+                ),
+                (
+                    "run_at",
+                    models.DateTimeField(verbose_name="Запустить не раньше"),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Попыток"
+                    ),
+                ),
+                (
+                    "max_attempts",
+                    models.PositiveSmallIntegerField(
+                        verbose_name="Максимум попыток"
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(
+                        blank=True, verbose_name="Последняя ошибка"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Начало выполнения",
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Окончание выполнения",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Фоновая задача",
+                "verbose_name_plural": "Фоновые задачи",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["run_at"],
+                name="task_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["status", "finished_at"], name="task_status_idx"
+            ),
+        ),
+    ]
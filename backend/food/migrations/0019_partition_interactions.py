@@ -0,0 +1,39 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:30
+
+from django.conf import settings
+from django.db import migrations
+
+from food import partitioning
+
+
+def partition(apps, schema_editor):
+    """Секционирование, если задано INTERACTION_PARTITIONS (PostgreSQL)."""
+    connection = schema_editor.connection
+    partitions = settings.INTERACTION_PARTITIONS
+    if connection.vendor != "postgresql" or not partitions:
+        return
+    with connection.cursor() as cursor:
+        for table in partitioning.PARTITIONED_TABLES:
+            if not partitioning.is_partitioned(cursor, table):
+                partitioning.rebuild(cursor, table, partitions)
+
+
+def merge(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        for table in partitioning.PARTITIONED_TABLES:
+            if partitioning.is_partitioned(cursor, table):
+                partitioning.rebuild(cursor, table, 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("food", "0018_task"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, merge),
+    ]
@@ -99,6 +99,9 @@ class Recipe(models.Model):
         ],
         help_text="Укажите время приготовления рецепта в минутах",
     )
+    updated_at = models.DateTimeField(
+        verbose_name="Дата изменения", auto_now=True, db_index=True
+    )
 
     class Meta:
         ordering = ["-id"]
@@ -111,6 +114,10 @@ class Recipe(models.Model):
                 name="unique_recipe",
             )
         ]
+        indexes = [
+            # Рецепты автора в порядке выдачи: фильтр ?author= и подписки
+            models.Index(fields=["author", "-id"], name="recipe_author_id_idx")
+        ]
 
 
 class IngredientRecipe(models.Model):
@@ -168,6 +175,9 @@ class ShoppingCart(models.Model):
         on_delete=models.CASCADE,
         help_text="Выберите рецепт для приготовления",
     )
+    created_at = models.DateTimeField(
+        verbose_name="Дата добавления", auto_now_add=True, db_index=True
+    )
 
     class Meta:
         verbose_name = "Список покупок"
@@ -197,6 +207,9 @@ class Favorite(models.Model):
         on_delete=models.CASCADE,
         verbose_name="Рецепты",
     )
+    created_at = models.DateTimeField(
+        verbose_name="Дата добавления", auto_now_add=True, db_index=True
+    )
 
     class Meta:
         verbose_name = "Избранные рецепты"
@@ -245,6 +258,216 @@ class Subscribe(models.Model):
         return f"Пользователь {self.user} подписан на {self.author}"
 
 
+class RecipeRanking(models.Model):
+    """
+    Рейтинги рецептов, пересчитываются командой compute_rankings.
+    Места уникальны и используются как ключ постраничного вывода.
+    """
+
+    recipe = models.OneToOneField(
+        Recipe,
+        primary_key=True,
+        verbose_name="Рецепт",
+        related_name="ranking",
+        on_delete=models.CASCADE,
+    )
+    popular_score = models.PositiveIntegerField(
+        verbose_name="Добавлений в избранное", default=0
+    )
+    trending_score = models.FloatField(
+        verbose_name="Популярность за последние дни", default=0
+    )
+    popular_rank = models.PositiveIntegerField(
+        verbose_name="Место в популярных", unique=True
+    )
+    trending_rank = models.PositiveIntegerField(
+        verbose_name="Место в набирающих популярность", unique=True
+    )
+
+    class Meta:
+        verbose_name = "Рейтинг рецепта"
+        verbose_name_plural = "Рейтинги рецептов"
+
+    def __str__(self):
+        return f"{self.recipe}: {self.popular_rank} / {self.trending_rank}"
+
+
+class SimilarRecipe(models.Model):
+    """
+    Похожие по составу рецепты,
+    пересчитываются командой compute_similar_recipes.
+    """
+
+    recipe = models.ForeignKey(
+        Recipe,
+        verbose_name="Рецепт",
+        related_name="similar_recipes",
+        on_delete=models.CASCADE,
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        verbose_name="Похожий рецепт",
+        related_name="similar_to",
+        on_delete=models.CASCADE,
+    )
+    score = models.FloatField(verbose_name="Схожесть")
+
+    class Meta:
+        verbose_name = "Похожий рецепт"
+        verbose_name_plural = "Похожие рецепты"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipe", "similar"], name="unique_similar_recipe"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["recipe", "-score"], name="similar_recipe_score_idx"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.recipe} ~ {self.similar}: {self.score:.2f}"
+
+
+class FeedEntry(models.Model):
+    """Лента пользователя: рецепты авторов из его подписок."""
+
+    user = models.ForeignKey(
+        User,
+        verbose_name="Подписчик",
+        related_name="feed",
+        on_delete=models.CASCADE,
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        verbose_name="Рецепт",
+        related_name="feed_entries",
+        on_delete=models.CASCADE,
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name="Автор рецепта",
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+
+    class Meta:
+        verbose_name = "Лента подписок"
+        verbose_name_plural = "Лента подписок"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"], name="unique_feed_entry"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-recipe"], name="feed_user_recipe_idx"
+            ),
+            models.Index(
+                fields=["user", "author"], name="feed_user_author_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.recipe} в ленте {self.user}"
+
+
+class MediaFile(models.Model):
+    """
+    Файл в хранилище с адресацией по содержимому и число ссылок на него
+    из моделей. Файлы без ссылок удаляет команда gc_media.
+    """
+
+    name = models.CharField(
+        verbose_name="Путь в хранилище", max_length=255, unique=True
+    )
+    refs = models.IntegerField(verbose_name="Ссылок", default=0)
+    updated_at = models.DateTimeField(
+        verbose_name="Дата изменения", auto_now=True
+    )
+
+    class Meta:
+        verbose_name = "Медиафайл"
+        verbose_name_plural = "Медиафайлы"
+        indexes = [
+            models.Index(
+                fields=["updated_at"],
+                condition=Q(refs__lte=0),
+                name="mediafile_orphan_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.name}: {self.refs}"
+
+
+class Task(models.Model):
+    """
+    Фоновая задача: вызов функции, помеченной api.tasks.task.
+    Выполняется командой run_worker.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Выполнена"),
+        (FAILED, "Ошибка"),
+    )
+
+    name = models.CharField(verbose_name="Функция", max_length=255)
+    args = models.JSONField(verbose_name="Аргументы", default=list)
+    kwargs = models.JSONField(
+        verbose_name="Именованные аргументы", default=dict
+    )
+    status = models.CharField(
+        verbose_name="Состояние",
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    run_at = models.DateTimeField(verbose_name="Запустить не раньше")
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name="Попыток", default=0
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name="Максимум попыток"
+    )
+    last_error = models.TextField(verbose_name="Последняя ошибка", blank=True)
+    created_at = models.DateTimeField(
+        verbose_name="Дата создания", auto_now_add=True
+    )
+    started_at = models.DateTimeField(
+        verbose_name="Начало выполнения", null=True, blank=True
+    )
+    finished_at = models.DateTimeField(
+        verbose_name="Окончание выполнения", null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        indexes = [
+            # Выбор готовых к запуску задач воркером
+            models.Index(
+                fields=["run_at"],
+                condition=Q(status="pending"),
+                name="task_pending_idx",
+            ),
+            # Зависшие задачи и метрики выполнения
+            models.Index(
+                fields=["status", "finished_at"], name="task_status_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
+
+
 class ShortLink(models.Model):
     """Модель коротких ссылок."""
 
@@ -254,9 +477,23 @@ class ShortLink(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+    clicks = models.PositiveBigIntegerField(
+        verbose_name="Переходов", default=0
+    )
+    last_clicked_at = models.DateTimeField(
+        verbose_name="Последний переход", null=True, blank=True
+    )
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # Переход по короткой ссылке ищет только активные ссылки
+            models.Index(
+                fields=["short_url"],
+                condition=Q(is_active=True),
+                name="shortlink_active_idx",
+            )
+        ]
 
     @staticmethod
     def get_short_url_prefix(long_url: str) -> str:
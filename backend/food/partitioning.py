@@ -0,0 +1,122 @@
+"""
+Хеш-секционирование таблиц избранного, списка покупок и подписок
+(декларативные секции PostgreSQL 11+). Таблица пересоздаётся
+секционированной с тем же именем, столбцами, последовательностью id,
+ограничениями и индексами, поэтому ORM работает с ней как раньше.
+Первичный ключ становится (id, ключ секционирования): уникальность
+id обеспечивает последовательность.
+"""
+import re
+
+# Таблица -> столбец, по хешу которого строки раскладываются по секциям
+PARTITIONED_TABLES = {
+    "food_favorite": "author_id",
+    "food_shoppingcart": "author_id",
+    "food_subscribe": "user_id",
+}
+PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p\d+$")
+
+
+def parent_table(name):
+    """Имя таблицы для имени её секции."""
+    match = PARTITION_NAME.match(name)
+    if match and match["table"] in PARTITIONED_TABLES:
+        return match["table"]
+    return name
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = %s::regclass",
+        [table],
+    )
+    return cursor.fetchone()[0]
+
+
+def partition_count(cursor, table):
+    cursor.execute(
+        "SELECT count(*) FROM pg_inherits WHERE inhparent = %s::regclass",
+        [table],
+    )
+    return cursor.fetchone()[0]
+
+
+def table_definition(cursor, table):
+    """
+    Имя первичного ключа, остальные ограничения и индексы
+    без ограничений.
+    """
+    cursor.execute(
+        "SELECT conname FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'p'",
+        [table],
+    )
+    (primary_key,) = cursor.fetchone()
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype <> 'p' "
+        "ORDER BY contype, conname",
+        [table],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+        "WHERE indrelid = %s::regclass AND NOT EXISTS ("
+        "SELECT 1 FROM pg_constraint WHERE conindid = indexrelid)",
+        [table],
+    )
+    indexes = [
+        # Индекс секционированной таблицы создаётся как ON ONLY
+        row[0].replace(" ON ONLY ", " ON ")
+        for row in cursor.fetchall()
+    ]
+    return primary_key, constraints, indexes
+
+
+def rebuild(cursor, table, partitions, key=None):
+    """
+    Перенос таблицы в новую таблицу с partitions хеш-секциями
+    (0 – обычная таблица) по столбцу key (по умолчанию – из
+    PARTITIONED_TABLES) в текущей транзакции. Таблица блокируется
+    на запись и чтение до конца транзакции.
+    """
+    key = key or PARTITIONED_TABLES[table]
+    new_table = f"{table}_new"
+    cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+    primary_key, constraints, indexes = table_definition(cursor, table)
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+    (sequence,) = cursor.fetchone()
+    cursor.execute(
+        f"CREATE TABLE {new_table} (LIKE {table} INCLUDING DEFAULTS)"
+        + (f" PARTITION BY HASH ({key})" if partitions else "")
+    )
+    for remainder in range(partitions):
+        cursor.execute(
+            f"CREATE TABLE {new_table}_p{remainder} "
+            f"PARTITION OF {new_table} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+    cursor.execute(f"INSERT INTO {new_table} SELECT * FROM {table}")
+    if sequence:
+        # Последовательность id не должна удалиться со старой таблицей
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+    for remainder in range(partitions):
+        cursor.execute(
+            f"ALTER TABLE {new_table}_p{remainder} "
+            f"RENAME TO {table}_p{remainder}"
+        )
+    if sequence:
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    cursor.execute(
+        f'ALTER TABLE {table} ADD CONSTRAINT "{primary_key}" PRIMARY KEY '
+        + (f"(id, {key})" if partitions else "(id)")
+    )
+    for name, definition in constraints:
+        cursor.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}'
+        )
+    for definition in indexes:
+        cursor.execute(definition)
+    cursor.execute(f"ANALYZE {table}")
@@ -0,0 +1,196 @@
+"""
+Планы запросов основных эндпоинтов (EXPLAIN (FORMAT JSON), PostgreSQL):
+запрос не должен читать большую таблицу полным просмотром.
+Используется командой check_query_plans и тестами food.tests.
+"""
+import json
+
+from django.db.models import Sum
+
+from users.models import User
+
+from . import partitioning
+from .models import (Favorite, FeedEntry, Ingredient, IngredientRecipe, Recipe,
+                     ShoppingCart, ShortLink, Subscribe, Tag)
+
+# Таблицы, полный просмотр которых на проде недопустим
+LARGE_TABLES = {
+    model._meta.db_table
+    for model in (
+        Recipe,
+        Recipe.tags.through,
+        IngredientRecipe,
+        Favorite,
+        ShoppingCart,
+        Subscribe,
+        FeedEntry,
+        ShortLink,
+        User,
+    )
+}
+# Тегов и ингредиентов в seed: фильтр по тегу выбирает малую долю
+# рецептов, в рецепте SEED_RECIPE_INGREDIENTS ингредиентов
+SEED_TAGS = 50
+SEED_INGREDIENTS = 500
+SEED_RECIPE_INGREDIENTS = 5
+
+
+def endpoint_queries(user_id, author_id, tag_slug):
+    """Запросы основных эндпоинтов в том виде, в каком их строит ORM."""
+    return {
+        "recipes?author=": Recipe.objects.filter(author_id=author_id)[:6],
+        "recipes?tags=": (
+            Recipe.objects.filter(tags__slug=tag_slug).distinct()[:6]
+        ),
+        "recipes?is_favorited=1": Recipe.objects.filter(
+            favorite__author_id=user_id
+        )[:6],
+        "recipes?is_in_shopping_cart=1": Recipe.objects.filter(
+            shopping_cart__author_id=user_id
+        )[:6],
+        "interactions": Favorite.objects.filter(author_id=user_id).values_list(
+            "recipe_id", flat=True
+        ),
+        "users/subscriptions": Subscribe.objects.filter(user_id=user_id)[:6],
+        "subscriptions recipes": Recipe.objects.filter(
+            author_id__in=[author_id]
+        ).values("author_id", "id", "name", "cooking_time", "image"),
+        "recipes/feed": FeedEntry.objects.filter(user_id=user_id).order_by(
+            "-recipe_id"
+        )[:6],
+        "download_shopping_cart": IngredientRecipe.objects.filter(
+            recipe__shopping_cart__author_id=user_id
+        )
+        .values("ingredient__name", "ingredient__measurement_unit")
+        .annotate(amounts=Sum("amount", distinct=True)),
+        "sl/<short_url>": ShortLink.objects.filter(
+            short_url="http://localhost/sl/seed/", is_active=True
+        ),
+    }
+
+
+def seed(count):
+    """
+    count рецептов и связанные данные в пропорциях прода: по 10 рецептов
+    на автора, по 5 избранных и рецептов в покупках на пользователя,
+    по 3 подписки, SEED_TAGS тегов и SEED_INGREDIENTS ингредиентов.
+    """
+    users = User.objects.bulk_create(
+        User(
+            username=f"seed{number}",
+            email=f"seed{number}@example.com",
+            first_name="seed",
+            last_name="seed",
+        )
+        for number in range(max(count // 10, 4))
+    )
+    tags = Tag.objects.bulk_create(
+        Tag(name=f"seed {number}", slug=f"seed-{number}")
+        for number in range(SEED_TAGS)
+    )
+    ingredients = Ingredient.objects.bulk_create(
+        Ingredient(name=f"seed {number}", measurement_unit="г")
+        for number in range(SEED_INGREDIENTS)
+    )
+    recipes = Recipe.objects.bulk_create(
+        Recipe(
+            author=users[number % len(users)],
+            name=f"seed {number}",
+            image="media/seed.png",
+            text="seed",
+            cooking_time=1,
+        )
+        for number in range(count)
+    )
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(
+            recipe_id=recipe.id, tag_id=tags[number % len(tags)].id
+        )
+        for number, recipe in enumerate(recipes)
+    )
+    IngredientRecipe.objects.bulk_create(
+        IngredientRecipe(
+            recipe=recipe,
+            ingredient=ingredients[
+                (number * SEED_RECIPE_INGREDIENTS + shift) % len(ingredients)
+            ],
+            amount=shift + 1,
+        )
+        for number, recipe in enumerate(recipes)
+        for shift in range(SEED_RECIPE_INGREDIENTS)
+    )
+    for model, step in ((Favorite, 7), (ShoppingCart, 11)):
+        model.objects.bulk_create(
+            (
+                model(
+                    author=users[number % len(users)],
+                    recipe=recipes[number * step % len(recipes)],
+                )
+                for number in range(len(users) * 5)
+            ),
+            ignore_conflicts=True,
+        )
+    Subscribe.objects.bulk_create(
+        Subscribe(user=user, author=users[(number + shift) % len(users)])
+        for number, user in enumerate(users)
+        for shift in (1, 2, 3)
+    )
+    FeedEntry.objects.bulk_create(
+        FeedEntry(
+            user=users[(number + 1) % len(users)],
+            recipe=recipe,
+            author_id=recipe.author_id,
+        )
+        for number, recipe in enumerate(recipes)
+    )
+    ShortLink.objects.bulk_create(
+        ShortLink(
+            long_url=f"http://localhost/recipes/{recipe.id}/",
+            short_url=f"http://localhost/sl/seed{recipe.id}/",
+        )
+        for recipe in recipes[: len(recipes) // 10]
+    )
+
+
+def seq_scans(plan):
+    """
+    Таблицы из LARGE_TABLES, которые план читает полным просмотром
+    (для секционированных таблиц – их секции).
+    """
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and (
+        partitioning.parent_table(plan.get("Relation Name", ""))
+        in LARGE_TABLES
+    ):
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", ()):
+        found.extend(seq_scans(child))
+    return found
+
+
+def explain(cursor, queryset):
+    """План запроса queryset (корневой узел EXPLAIN (FORMAT JSON))."""
+    sql, params = queryset.query.sql_with_params()
+    cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def check(cursor, using):
+    """
+    Планы endpoint_queries на данных базы using:
+    словарь эндпоинт -> таблицы, прочитанные полным просмотром.
+    """
+    user = User.objects.using(using).order_by("id").first()
+    tag = Tag.objects.using(using).order_by("id").first()
+    queries = endpoint_queries(
+        user.id if user else 0,
+        user.id if user else 0,
+        tag.slug if tag else "",
+    )
+    return {
+        name: seq_scans(explain(cursor, queryset.using(using)))
+        for name, queryset in queries.items()
+    }
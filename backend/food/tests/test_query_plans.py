@@ -0,0 +1,67 @@
+"""
+Планы запросов основных эндпоинтов на заполненной базе PostgreSQL
+с обычными настройками планировщика: ни один не читает большую
+таблицу полным просмотром.
+"""
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from food import partitioning, query_plans
+from food.models import Favorite, ShoppingCart, Subscribe
+from users.models import User
+
+# Рецептов в seed: на таких объёмах планировщик уже выбирает индексы,
+# если они есть
+SEED_RECIPES = 5000
+INDEX_SCANS = ("Index Scan", "Index Only Scan", "Bitmap Heap Scan")
+
+
+def index_scans(plan):
+    """Таблицы, которые план читает по индексу."""
+    tables = set()
+    if plan["Node Type"] in INDEX_SCANS:
+        tables.add(partitioning.parent_table(plan["Relation Name"]))
+    for child in plan.get("Plans", ()):
+        tables |= index_scans(child)
+    return tables
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN (FORMAT JSON)")
+class QueryPlansTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        query_plans.seed(SEED_RECIPES)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def test_no_seq_scans(self):
+        with connection.cursor() as cursor:
+            for name, tables in query_plans.check(cursor, "default").items():
+                with self.subTest(name):
+                    self.assertEqual(tables, [])
+
+    def test_interaction_indexes(self):
+        """
+        Выборки по Favorite(author), ShoppingCart(author) и
+        Subscribe(user) идут по индексам внешних ключей author_id /
+        user_id (и уникальным ограничениям, где эти столбцы первые) –
+        отдельные составные индексы для них не нужны.
+        """
+        queries = query_plans.endpoint_queries(
+            User.objects.order_by("id").first().id, 0, ""
+        )
+        with connection.cursor() as cursor:
+            for name, model in (
+                ("interactions", Favorite),
+                ("recipes?is_in_shopping_cart=1", ShoppingCart),
+                ("users/subscriptions", Subscribe),
+            ):
+                with self.subTest(name):
+                    self.assertIn(
+                        model._meta.db_table,
+                        index_scans(
+                            query_plans.explain(cursor, queries[name])
+                        ),
+                    )
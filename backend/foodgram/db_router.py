@@ -0,0 +1,41 @@
+import random
+
+from asgiref.local import Local
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_state = Local()
+
+
+def use_replicas(enabled: bool) -> None:
+    """Разрешить / запретить чтение из реплик в текущем запросе."""
+    _state.use_replicas = enabled
+
+
+class ReplicaRouter:
+    """
+    Роутер БД: запись и миграции – только в основную БД,
+    чтение – из случайной реплики, если это разрешено middleware
+    и нет открытой транзакции.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if (
+            not settings.DATABASE_REPLICAS
+            or not getattr(_state, "use_replicas", False)
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
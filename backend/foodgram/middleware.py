@@ -0,0 +1,171 @@
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+from rest_framework.permissions import SAFE_METHODS
+
+from api.cache import get_version
+
+from .db_router import use_replicas
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Безопасные запросы читают из реплик.
+    После успешной записи пользователь на REPLICA_PIN_SECONDS
+    закрепляется за основной БД (cookie и метка в кеше по токену),
+    чтобы сразу видеть свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def pin_key(request):
+        token = request.META.get("HTTP_AUTHORIZATION")
+        if not token:
+            return None
+        return "db-pin:" + sha1(token.encode()).hexdigest()
+
+    def is_pinned(self, request):
+        if request.COOKIES.get(settings.REPLICA_PIN_COOKIE):
+            return True
+        key = self.pin_key(request)
+        return key is not None and cache.get(key, False)
+
+    def pin(self, request, response):
+        response.set_cookie(
+            settings.REPLICA_PIN_COOKIE,
+            "1",
+            max_age=settings.REPLICA_PIN_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+        key = self.pin_key(request)
+        if key is not None:
+            cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        is_safe = request.method in SAFE_METHODS
+        use_replicas(is_safe and not self.is_pinned(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            use_replicas(False)
+        if not is_safe and response.status_code < 400:
+            self.pin(request, response)
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Сжатие ответов gzip или brotli (если установлен) по Accept-Encoding.
+    Ответы из PRECOMPRESSED_PATHS хранятся в кеше уже сжатыми
+    и отдаются без вызова view, пока не сменится версия данных.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def negotiate(request):
+        accepted = {}
+        for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+            coding, _, params = part.strip().partition(";")
+            quality = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[coding.strip().lower()] = quality
+        best, best_quality = None, 0
+        for coding in ("br", "gzip"):
+            if coding == "br" and brotli is None:
+                continue
+            quality = accepted.get(coding, accepted.get("*", 0))
+            if quality > best_quality:
+                best, best_quality = coding, quality
+        return best
+
+    @staticmethod
+    def compress(content, coding):
+        if coding == "br":
+            return brotli.compress(content)
+        return compress_string(content)
+
+    @staticmethod
+    def is_compressible(response):
+        content_type = response.get("Content-Type", "")
+        return (
+            not response.streaming
+            and not response.has_header("Content-Encoding")
+            and len(response.content) >= settings.COMPRESSION_MIN_SIZE
+            and content_type.startswith(settings.COMPRESSION_CONTENT_TYPES)
+        )
+
+    @staticmethod
+    def precompressed_key(request, coding):
+        namespace = settings.PRECOMPRESSED_PATHS.get(request.path_info)
+        if (
+            namespace is None
+            or request.method != "GET"
+            or request.META.get("QUERY_STRING")
+        ):
+            return None
+        return (
+            f"precompressed:{namespace}:{get_version(namespace)}:"
+            f"{coding}:{request.get_host()}"
+        )
+
+    @staticmethod
+    def encoded_response(content, content_type, vary, coding):
+        response = HttpResponse(content, content_type=content_type)
+        response["Content-Encoding"] = coding
+        response["Vary"] = vary
+        return response
+
+    def __call__(self, request):
+        coding = self.negotiate(request)
+        key = coding and self.precompressed_key(request, coding)
+        if key:
+            cached = cache.get(key)
+            if cached is not None:
+                return self.encoded_response(*cached, coding)
+
+        response = self.get_response(request)
+
+        if response.streaming or not response.get(
+            "Content-Type", ""
+        ).startswith(settings.COMPRESSION_CONTENT_TYPES):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if coding is None or not self.is_compressible(response):
+            return response
+        compressed = self.compress(response.content, coding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = coding
+        if response.has_header("ETag"):
+            etag = response["ETag"]
+            if etag.startswith('"'):
+                response["ETag"] = "W/" + etag
+        if key and response.status_code == 200:
+            cache.set(
+                key,
+                (compressed, response["Content-Type"], response["Vary"]),
+                settings.PRECOMPRESSED_TTL,
+            )
+        return response
@@ -0,0 +1,119 @@
+"""
+OpenAPI-схема API. Генерация drf-yasg занимает секунды, поэтому схема
+собирается один раз на версию кода (manage.py generate_schema при сборке
+образа или при первом запросе), хранится в SCHEMA_ROOT и в памяти
+процесса и отдаётся с ETag.
+"""
+import os
+from functools import lru_cache
+from hashlib import sha1
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.views import get_schema_view
+from rest_framework.permissions import AllowAny
+
+info = openapi.Info(
+    title="Foodgram API",
+    default_version="v1",
+    description="Документация для приложения food проекта Foodgram",
+    contact=openapi.Contact(email="radogask9rsd@gmail.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+schema_view = get_schema_view(
+    info,
+    public=True,
+    permission_classes=(AllowAny,),
+)
+
+CODECS = {"json": OpenAPICodecJson, "yaml": OpenAPICodecYaml}
+# format рендереров drf-yasg -> кодек готовой схемы
+RENDERER_CODECS = {"openapi": "json", ".json": "json", ".yaml": "yaml"}
+
+_schemas = {}
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """CODE_VERSION из окружения или хеш исходников приложений проекта."""
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+    base_dir = Path(settings.BASE_DIR)
+    roots = {Path(__file__).parent} | {
+        Path(config.path)
+        for config in apps.get_app_configs()
+        if base_dir in Path(config.path).parents
+    }
+    digest = sha1()
+    for path in sorted(
+        path for root in roots for path in root.rglob("*.py")
+    ):
+        digest.update(str(path.relative_to(base_dir)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def schema_path(codec):
+    return Path(settings.SCHEMA_ROOT) / f"openapi-{code_version()}.{codec}"
+
+
+def build_schema(codecs=tuple(CODECS)):
+    """
+    Генерирует схему в форматах codecs и сохраняет в SCHEMA_ROOT.
+    Если каталог недоступен для записи, схема остаётся только в памяти.
+    """
+    schema = schema_view.generator_class(info).get_schema(
+        request=None, public=True
+    )
+    bodies = {
+        codec: CODECS[codec](validators=[]).encode(schema)
+        for codec in codecs
+    }
+    for codec, body in bodies.items():
+        path = schema_path(codec)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(body)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+        _schemas[codec] = (body, '"{}"'.format(sha1(body).hexdigest()))
+    return bodies
+
+
+def get_schema(codec):
+    """Тело и ETag схемы: из памяти процесса, с диска или новая."""
+    if codec not in _schemas:
+        try:
+            body = schema_path(codec).read_bytes()
+        except FileNotFoundError:
+            build_schema((codec,))
+        else:
+            _schemas[codec] = (body, '"{}"'.format(sha1(body).hexdigest()))
+    return _schemas[codec]
+
+
+class SchemaView(schema_view):
+    """Отдаёт готовую схему; страницы swagger и redoc – как drf-yasg."""
+
+    def get(self, request, version="", format=None):
+        renderer = request.accepted_renderer
+        codec = RENDERER_CODECS.get(renderer.format)
+        if codec is None:
+            return super().get(request, version, format)
+        body, etag = get_schema(codec)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                body, content_type=f"{renderer.media_type}; charset=utf-8"
+            )
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
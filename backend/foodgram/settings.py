@@ -2,6 +2,8 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = (
@@ -36,6 +38,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "foodgram.middleware.CompressionMiddleware",
+    "foodgram.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -67,7 +71,7 @@ WSGI_APPLICATION = "foodgram.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": os.getenv("DB_ENGINE", "django.db.backends.postgresql"),
         "NAME": os.getenv("POSTGRES_DB"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
@@ -76,6 +80,68 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения: хосты (DB_REPLICA_HOSTS) и/или имена БД
+# (DB_REPLICA_NAMES, для SQLite – пути к файлам) через запятую,
+# i-я реплика – i-е значения списков, остальное берётся из default
+DB_REPLICA_HOSTS = [
+    host.strip()
+    for host in os.getenv("DB_REPLICA_HOSTS", "").split(",")
+    if host.strip()
+]
+DB_REPLICA_NAMES = [
+    name.strip()
+    for name in os.getenv("DB_REPLICA_NAMES", "").split(",")
+    if name.strip()
+]
+if (
+    DB_REPLICA_HOSTS
+    and DB_REPLICA_NAMES
+    and len(DB_REPLICA_HOSTS) != len(DB_REPLICA_NAMES)
+):
+    raise ImproperlyConfigured(
+        "DB_REPLICA_HOSTS и DB_REPLICA_NAMES должны быть одной длины"
+    )
+DATABASE_REPLICAS = []
+for number in range(max(len(DB_REPLICA_HOSTS), len(DB_REPLICA_NAMES))):
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "TEST": {"MIRROR": "default"},
+    }
+    if DB_REPLICA_HOSTS:
+        DATABASES[alias]["HOST"] = DB_REPLICA_HOSTS[number]
+    if DB_REPLICA_NAMES:
+        DATABASES[alias]["NAME"] = DB_REPLICA_NAMES[number]
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["foodgram.db_router.ReplicaRouter"]
+
+# Число хеш-секций таблиц избранного, покупок и подписок при миграции
+# (food.partitioning); 0 – обычные таблицы. Изменить позже –
+# manage.py partition_tables
+INTERACTION_PARTITIONS = int(os.getenv("INTERACTION_PARTITIONS", 0))
+
+# Сколько секунд после записи пользователь читает только из основной БД
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+REPLICA_PIN_COOKIE = "primary_db_pin"
+
+# Общий для всех воркеров gunicorn кеш на одном хосте
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "/tmp/foodgram_cache"),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
+# Общий для воркеров на одном хосте файл корзин api.throttling
+# и число ячеек в нём (по 24 байта)
+THROTTLE_FILE = os.getenv("THROTTLE_FILE", "/tmp/foodgram_throttle")
+THROTTLE_SLOTS = int(os.getenv("THROTTLE_SLOTS", 65536))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -104,6 +170,10 @@ STATIC_ROOT = BASE_DIR / "collected_static"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = "/media/"
+# Файлы называются по содержимому, дубликаты не сохраняются
+DEFAULT_FILE_STORAGE = "foodgram.storage.ContentAddressedStorage"
+# Файлы без ссылок удаляются gc_media не раньше, чем через столько секунд
+MEDIA_GC_GRACE_SECONDS = 24 * 60 * 60
 
 AUTH_USER_MODEL = "users.User"
 
@@ -112,18 +182,99 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
+    "DEFAULT_THROTTLE_CLASSES": [
+        "api.throttling.TokenBucketThrottle",
+    ],
+    # Ёмкость корзины / время её полного пополнения
+    "DEFAULT_THROTTLE_RATES": {
+        "favorite": "60/min",
+        "shopping_cart": "60/min",
+        "get_link": "30/min",
+        "avatar": "10/min",
+        "recipe_create": "20/min",
+    },
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 6,
 }
 
+# Сжатие ответов: минимальный размер, типы и ответы,
+# которые хранятся в кеше уже сжатыми (путь -> версия в кеше)
+COMPRESSION_MIN_SIZE = 1024
+# text/html не сжимается из-за BREACH (CSRF-токены в админке)
+COMPRESSION_CONTENT_TYPES = (
+    "application/json",
+    "application/openapi+json",
+    "application/yaml",
+    "text/plain",
+)
+PRECOMPRESSED_PATHS = {
+    "/api/tags/": "tags",
+    "/api/ingredients/": "ingredients",
+}
+PRECOMPRESSED_TTL = 60 * 60 * 24
+# Хосты, для которых воркер gunicorn после запуска заполняет кеш
+# сжатых ответов из PRECOMPRESSED_PATHS (foodgram.warmup)
+WARMUP_HOSTS = [
+    host.strip()
+    for host in os.getenv("WARMUP_HOSTS", ALLOWED_HOSTS[-1]).split(",")
+    if host.strip()
+]
+
+# Время жизни кеша ответов для анонимных пользователей
+RESPONSE_CACHE_TTL = 60 * 10
+
+# Время жизни кеша фрагментов ответа с рецептом (ключ включает updated_at)
+RECIPE_FRAGMENT_TTL = 60 * 60 * 24
+
+# Время жизни журнала изменений индекса поиска по ингредиентам
+# (api.pantry); процесс, отставший сильнее, перестраивает индекс
+PANTRY_CHANGES_TTL = 60 * 60
+
+# Время жизни кеша избранного, покупок и подписок пользователя
+INTERACTIONS_CACHE_TTL = 60 * 15
+
+# Кеш аутентификации по токену
+TOKEN_CACHE_SIZE = 1024
+TOKEN_CACHE_LOCAL_TTL = 10
+TOKEN_CACHE_TTL = 300
+
 SIMPLE_JWT = {
     # Устанавливаем срок жизни токена
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Переходы по коротким ссылкам копятся в памяти процесса
+# и пишутся в БД не чаще раза в SHORT_LINK_FLUSH_INTERVAL секунд;
+# sweep_short_links отключает ссылки без переходов за EXPIRY_DAYS дней
+SHORT_LINK_FLUSH_INTERVAL = 10
+SHORT_LINK_EXPIRY_DAYS = 365
+
+# Фоновые задачи (api.tasks, run_worker): число попыток, задержка
+# первого повтора (удваивается), через сколько секунд выполняющаяся
+# задача считается зависшей, пауза опроса пустой очереди
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 10
+TASK_TIMEOUT = 60 * 30
+TASK_POLL_INTERVAL = 1
+TASK_KEEP_DAYS = 7
+
+# Готовая OpenAPI-схема пересобирается при смене версии кода
+# (по умолчанию – хеш исходников)
+CODE_VERSION = os.getenv("CODE_VERSION", "")
+SCHEMA_ROOT = os.getenv("SCHEMA_ROOT", BASE_DIR / "openapi")
+
 SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {
         "Bearer": {"type": "apiKey", "name": "Authorization", "in": "header"}
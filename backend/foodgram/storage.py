@@ -0,0 +1,75 @@
+import os
+import tempfile
+from hashlib import sha256
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils import timezone
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище, называющее файлы по sha256 содержимого:
+    <каталог upload_to>/<2 символа хеша>/<хеш><расширение>.
+    Повторная загрузка той же картинки не пишет новый файл,
+    каждый файл учитывается в MediaFile для сборки мусора.
+    Имена неизменяемы, поэтому nginx отдаёт /media/ с immutable.
+    """
+
+    @staticmethod
+    def content_name(name, content):
+        digest = sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        directory, basename = os.path.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        hexdigest = digest.hexdigest()
+        return os.path.join(
+            directory, hexdigest[:2], hexdigest + extension
+        ).replace("\\", "/")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        MediaFile = apps.get_model("food", "MediaFile")
+        with transaction.atomic():
+            # Строка MediaFile блокируется до проверки и записи файла:
+            # gc_media не удалит файл, который мы сочли уже записанным.
+            # Новая дата защищает файл до сохранения модели.
+            if not MediaFile.objects.filter(name=name).update(
+                updated_at=timezone.now()
+            ):
+                MediaFile.objects.get_or_create(name=name)
+            return super().save(name, content, max_length)
+
+    def get_available_name(self, name, max_length=None):
+        # Одинаковое содержимое – одно имя, файл не перезаписывается
+        return name
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            return name
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        if self.directory_permissions_mode is not None:
+            os.chmod(directory, self.directory_permissions_mode)
+        # Запись во временный файл и атомарная замена: одновременная
+        # загрузка того же содержимого даёт тот же файл
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            os.chmod(tmp_path, self.file_permissions_mode or 0o644)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return name
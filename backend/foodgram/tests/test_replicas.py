@@ -0,0 +1,124 @@
+"""
+Маршрутизация запросов между основной БД и репликами
+(ReplicaRouter и ReplicaRoutingMiddleware). Реплика – отдельная
+база SQLite в памяти со своими строками, поэтому по ответу видно,
+откуда было чтение.
+"""
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+
+from food.models import Ingredient
+from foodgram.middleware import ReplicaRoutingMiddleware
+
+REPLICA = "replica_test"
+
+
+def read_view(request):
+    """Ответ – названия ингредиентов из БД, выбранной для чтения."""
+    if request.method == "POST":
+        Ingredient.objects.create(name="новый", measurement_unit="г")
+    names = Ingredient.objects.values_list("name", flat=True)
+    return HttpResponse(",".join(sorted(names)), status=201)
+
+
+def atomic_view(request):
+    with transaction.atomic():
+        return read_view(request)
+
+
+def failed_write_view(request):
+    return HttpResponse(status=400)
+
+
+@override_settings(
+    DATABASE_REPLICAS=[REPLICA],
+    DATABASE_ROUTERS=["foodgram.db_router.ReplicaRouter"],
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    },
+)
+class ReplicaRoutingTest(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        connections.databases[REPLICA] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": ":memory:",
+        }
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Ingredient)
+        Ingredient.objects.using(REPLICA).create(
+            name="реплика", measurement_unit="г"
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.databases[REPLICA]
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        Ingredient.objects.create(name="основная", measurement_unit="г")
+        self.factory = RequestFactory()
+
+    def call(self, request, view=read_view):
+        return ReplicaRoutingMiddleware(view)(request)
+
+    def test_safe_request_reads_replica(self):
+        response = self.call(self.factory.get("/"))
+        self.assertEqual(response.content.decode(), "реплика")
+        self.assertNotIn("primary_db_pin", response.cookies)
+
+    def test_write_goes_to_primary(self):
+        response = self.call(self.factory.post("/"))
+        self.assertEqual(response.content.decode(), "новый,основная")
+        self.assertTrue(
+            Ingredient.objects.using("default").filter(name="новый").exists()
+        )
+        self.assertFalse(
+            Ingredient.objects.using(REPLICA).filter(name="новый").exists()
+        )
+
+    def test_atomic_reads_primary(self):
+        response = self.call(self.factory.get("/"), atomic_view)
+        self.assertEqual(response.content.decode(), "основная")
+
+    def test_cookie_pin_after_write(self):
+        response = self.call(self.factory.post("/"))
+        cookie = response.cookies["primary_db_pin"]
+        self.factory.cookies["primary_db_pin"] = cookie.value
+        response = self.call(self.factory.get("/"))
+        self.assertEqual(response.content.decode(), "новый,основная")
+
+    def test_token_pin_after_write(self):
+        self.call(self.factory.post("/", HTTP_AUTHORIZATION="Token first"))
+        response = self.call(
+            self.factory.get("/", HTTP_AUTHORIZATION="Token first")
+        )
+        self.assertEqual(response.content.decode(), "новый,основная")
+        response = self.call(
+            self.factory.get("/", HTTP_AUTHORIZATION="Token second")
+        )
+        self.assertEqual(response.content.decode(), "реплика")
+
+    def test_failed_write_does_not_pin(self):
+        response = self.call(
+            self.factory.post("/", HTTP_AUTHORIZATION="Token first"),
+            failed_write_view,
+        )
+        self.assertNotIn("primary_db_pin", response.cookies)
+        response = self.call(
+            self.factory.get("/", HTTP_AUTHORIZATION="Token first")
+        )
+        self.assertEqual(response.content.decode(), "реплика")
+
+    def test_no_replicas(self):
+        with self.settings(DATABASE_REPLICAS=[]):
+            response = self.call(self.factory.get("/"))
+        self.assertEqual(response.content.decode(), "основная")
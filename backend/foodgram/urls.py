@@ -2,39 +2,43 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework.permissions import AllowAny
 
 from api.services import redirection
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Foodgram API",
-        default_version="v1",
-        description="Документация для приложения food проекта Foodgram",
-        contact=openapi.Contact(email="radogask9rsd@gmail.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(AllowAny,),
-)
+
+def schema_view(method, *args, **kwargs):
+    """
+    Вьюха документации, drf-yasg импортируется при первом запросе:
+    управляющим командам и воркеру задач он не нужен.
+    """
+    view = None
+
+    def lazy_view(request, *view_args, **view_kwargs):
+        nonlocal view
+        if view is None:
+            from .schema import SchemaView
+
+            view = getattr(SchemaView, method)(*args, **kwargs)
+        return view(request, *view_args, **view_kwargs)
+
+    return lazy_view
+
 
 urlpatterns = [
     # API docs
     path(
         "swagger<format>/",
-        schema_view.without_ui(cache_timeout=0),
+        schema_view("without_ui", cache_timeout=0),
         name="schema-json",
     ),
     path(
         "swagger/",
-        schema_view.with_ui("swagger", cache_timeout=0),
+        schema_view("with_ui", "swagger", cache_timeout=0),
         name="schema-swagger-ui",
     ),
     path(
         "redoc/",
-        schema_view.with_ui("redoc", cache_timeout=0),
+        schema_view("with_ui", "redoc", cache_timeout=0),
         name="schema-redoc",
     ),
     path("api/", include("api.urls")),
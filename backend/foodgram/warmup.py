@@ -0,0 +1,90 @@
+"""
+Подготовка процессов gunicorn (gunicorn.conf.py).
+preload() выполняется в мастере после загрузки приложения, до fork:
+модули, urlconf и OpenAPI-схема достаются воркерам готовыми.
+warm_up() выполняется в каждом воркере после fork: соединение с БД,
+кеши справочников тегов и ингредиентов и индекс поиска ингредиентов.
+Запуск как модуля печатает время этапов (manage.py profile_startup).
+"""
+import json
+import logging
+import os
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def preload():
+    """Импорт всего urlconf и загрузка схемы в память без запросов к БД."""
+    from django import db
+    from django.urls import get_resolver
+
+    from . import schema
+
+    get_resolver().url_patterns
+    for codec in schema.CODECS:
+        schema.get_schema(codec)
+    # Соединения мастера не должны достаться воркерам
+    db.connections.close_all()
+
+
+def warm_up():
+    """
+    Запросы справочников через весь стек middleware: заполняют общий кеш
+    сжатых ответов и прогревают соединение с БД. Ошибки не мешают
+    воркеру начать работу.
+    """
+    from django import db
+    from django.conf import settings
+    from django.test import RequestFactory
+
+    from api import ingredient_search
+
+    from .wsgi import application
+
+    db.connections.close_all()
+    try:
+        ingredient_search.get_index()
+    except Exception:
+        logger.exception("Не удалось построить индекс поиска ингредиентов")
+    factory = RequestFactory()
+    for host in settings.WARMUP_HOSTS:
+        for path in settings.PRECOMPRESSED_PATHS:
+            for coding in ("br", "gzip"):
+                try:
+                    application.get_response(
+                        factory.get(
+                            path, HTTP_HOST=host, HTTP_ACCEPT_ENCODING=coding
+                        )
+                    )
+                except Exception:
+                    logger.exception("Не удалось прогреть %s%s", host, path)
+
+
+def main():
+    """Время этапов запуска в секундах, JSON в stdout."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "foodgram.settings")
+    timings = {}
+    started = time.perf_counter()
+    import django
+
+    django.setup()
+    timings["setup"] = time.perf_counter() - started
+    mark = time.perf_counter()
+    from .wsgi import application  # noqa: F401
+
+    timings["wsgi"] = time.perf_counter() - mark
+    mark = time.perf_counter()
+    preload()
+    timings["preload"] = time.perf_counter() - mark
+    if "--warm-up" in sys.argv:
+        mark = time.perf_counter()
+        warm_up()
+        timings["warm_up"] = time.perf_counter() - mark
+    timings["total"] = time.perf_counter() - started
+    sys.stdout.write(json.dumps(timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Настройки gunicorn. Приложение загружается в мастере (preload_app),
+воркеры получают импортированные модули и схему API после fork
+и прогревают кеши до первого запроса.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(
+    os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+preload_app = True
+
+
+def when_ready(server):
+    from foodgram import warmup
+
+    warmup.preload()
+
+
+def post_fork(server, worker):
+    from foodgram import warmup
+
+    warmup.warm_up()
@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
+from api import deletion
+
 from .models import User
 
 
@@ -24,3 +26,15 @@ class UserAdmin(UserAdmin):
         "email",
     )
     empty_value_display = "-"
+    actions = ("bulk_delete",)
+
+    @admin.action(
+        description="Удалить выбранных пользователей с рецептами пачками",
+        permissions=("delete",),
+    )
+    def bulk_delete(self, request, queryset):
+        ids = list(queryset.values_list("id", flat=True))
+        deletion.delete_users_by_id.delay(ids)
+        self.message_user(
+            request, f"Удаление пользователей поставлено в очередь: {len(ids)}"
+        )
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.16 on 2026-10-19 15:10
+
+from django.db import migrations, models
+from django.db.models import Count
+
+from api import constants
+
+
+def mark_popular_authors(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    Subscribe = apps.get_model("food", "Subscribe")
+    User.objects.filter(
+        id__in=Subscribe.objects.values("author_id")
+        .annotate(followers=Count("id"))
+        .filter(followers__gt=constants.FEED_FANOUT_MAX_FOLLOWERS)
+        .values("author_id")
+    ).update(is_popular=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0008_remove_user_role"),
+        ("food", "0011_alter_subscribe_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="is_popular",
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                help_text=(
+                    "Рецепты автора не раскладываются по лентам подписчиков"
+                ),
+                verbose_name="Популярный автор",
+            ),
+        ),
+        migrations.RunPython(mark_popular_authors, migrations.RunPython.noop),
+    ]
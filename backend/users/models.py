@@ -26,6 +26,12 @@ class User(AbstractUser):
         max_length=constants.MAX_LEN_PASSWORD, verbose_name="Пароль"
     )
     avatar = models.ImageField(upload_to="users/", null=True, default=None)
+    is_popular = models.BooleanField(
+        verbose_name="Популярный автор",
+        default=False,
+        editable=False,
+        help_text="Рецепты автора не раскладываются по лентам подписчиков",
+    )
 
     REQUIRED_FIELDS = ["username", "password", "first_name", "last_name"]
     USERNAME_FIELD = "email"
@@ -3,7 +3,7 @@ from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
-from food.models import Subscribe
+from api.interactions import get_interactions
 from users.models import User
 
 from .constants import (MAX_LEN_EMAIL, MAX_LEN_FIRST_NAME, MAX_LEN_LAST_NAME,
@@ -97,14 +97,10 @@ class UserListRetrieveSerializer(serializers.ModelSerializer):
         }
 
     def get_is_subscribed(self, obj):
-        request_user = self.context.get("request").user
-        if not request_user.is_anonymous:
-            # user это пользователь у которого нужно проверить
-            # подписку на author автора рецепта
-            return Subscribe.objects.filter(
-                user=request_user, author=obj
-            ).exists()
-        return False
+        # подписан ли текущий пользователь на obj (автора рецепта)
+        return obj.id in (
+            get_interactions(self.context.get("request")).following
+        )
 
 
 class UserUpdateAvatarSerializer(serializers.ModelSerializer):
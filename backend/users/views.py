@@ -6,6 +6,7 @@ from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from api import feed, interactions
 from api.permissions import IsAdminIsAuthor, IsAdminIsAuthorOrReadOnly
 from api.serializers import SubscribeListCreateDeleteSerializer
 from food.models import Subscribe
@@ -30,6 +31,11 @@ class UserViewSet(viewsets.ModelViewSet):
         SubscribeListCreateDeleteSerializer: ("subscriptions", "subscribe"),
     }
 
+    throttle_scopes = {
+        "avatar": "avatar",
+        "delete_avatar": "avatar",
+    }
+
     def get_serializer_class(self):
         for serializer, actions in UserViewSet.actions.items():
             if self.action in actions:
@@ -112,7 +118,9 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,),
     )
     def subscriptions(self, request):
-        subscriptions = Subscribe.objects.filter(user=request.user)
+        subscriptions = Subscribe.objects.filter(user=request.user).only(
+            "id", "author_id"
+        )
         pages = self.paginate_queryset(subscriptions)
         serializer = self.get_serializer_class()(
             pages, many=True, context={"request": request}
@@ -139,6 +147,8 @@ class UserViewSet(viewsets.ModelViewSet):
         )
         if serializer.is_valid(raise_exception=True):
             serializer.save(author=author, user=user)
+            interactions.invalidate(user.id)
+            feed.backfill(user, author)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(
             {"errors": "Страница не найдена"}, status=status.HTTP_404_NOT_FOUND
@@ -151,6 +161,8 @@ class UserViewSet(viewsets.ModelViewSet):
         subscribe_object = Subscribe.objects.filter(author=author, user=user)
         if subscribe_object.exists():
             subscribe_object.delete()
+            interactions.invalidate(user.id)
+            feed.trim(user, author)
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response(
             {"errors": "Подписка не найдена"},